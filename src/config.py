@@ -11,6 +11,54 @@ BATCH_SIZE = monitor.get_batch_size()
 INGESTION_CHUNKSIZE = 10 
 DYNAMIC_CACHE_SIZE = int(psutil.virtual_memory().total * 0.15 / -1024)
 CLEANUP_MODULO = monitor.get_cleanup_modulo()
+# Profondeur des files entre étages du pipeline (Décodage/CLIP/Métadonnées/Écriture)
+PIPELINE_QUEUE_SIZE = int(os.getenv("PIPELINE_QUEUE_SIZE", "2"))
+# Budget par fichier : au-delà, le worker est tué, relancé et le fichier mis en quarantaine
+TASK_TIMEOUT = int(os.getenv("TASK_TIMEOUT", "600"))
+TASK_MEMORY_LIMIT_MB = int(os.getenv("TASK_MEMORY_LIMIT_MB", "4096"))
+# H5 : nombre de valeurs regroupées par document pour les vecteurs 1-D
+H5_WINDOW_SIZE = int(os.getenv("H5_WINDOW_SIZE", "256"))
+# PDF : un document par fenêtre de pages, plafond de pages, découpage des gros fichiers
+PDF_PAGES_PER_DOC = int(os.getenv("PDF_PAGES_PER_DOC", "1"))
+PDF_MAX_PAGES = int(os.getenv("PDF_MAX_PAGES", "500"))
+PDF_SPLIT_PAGES = int(os.getenv("PDF_SPLIT_PAGES", "50"))
+# TXT (listes) : dédoublonnage des lignes par filtre de Bloom (mémoire fixe, ~12 Mo pour 5M lignes)
+TXT_DEDUP_MAX_LINES = int(os.getenv("TXT_DEDUP_MAX_LINES", "5000000"))
+# Taux de faux positifs : proportion de lignes distinctes écartées à tort comme doublons
+TXT_DEDUP_ERROR_RATE = float(os.getenv("TXT_DEDUP_ERROR_RATE", "0.0001"))
+# Décodage image : threads dédiés et taille d'entrée CLIP (décodage JPEG réduit + resize direct)
+IMAGE_DECODE_THREADS = int(os.getenv("IMAGE_DECODE_THREADS", str(min(8, os.cpu_count() or 1))))
+CLIP_INPUT_SIZE = int(os.getenv("CLIP_INPUT_SIZE", "224"))
+# LanceDB : écritures regroupées en un commit au-delà de ce nombre de lignes ou d'octets
+WRITE_FLUSH_ROWS = int(os.getenv("WRITE_FLUSH_ROWS", "4096"))
+WRITE_FLUSH_BYTES = int(os.getenv("WRITE_FLUSH_BYTES", str(64 * 1024 * 1024)))
+# Maintenance LanceDB : déclencheurs (fragments, lignes supprimées, lignes hors index), rétention, période
+MAINT_MAX_FRAGMENTS = int(os.getenv("MAINT_MAX_FRAGMENTS", "64"))
+MAINT_DELETED_RATIO = float(os.getenv("MAINT_DELETED_RATIO", "0.1"))
+MAINT_UNINDEXED_RATIO = float(os.getenv("MAINT_UNINDEXED_RATIO", "0.1"))
+MAINT_KEEP_VERSIONS_DAYS = int(os.getenv("MAINT_KEEP_VERSIONS_DAYS", "7"))
+MAINT_INTERVAL = int(os.getenv("MAINT_INTERVAL", "3600"))
+# Index vectoriels : seuil sous lequel on garde le scan plat, ré-entraînement, paramètres de recherche
+VECTOR_INDEX_MIN_ROWS = int(os.getenv("VECTOR_INDEX_MIN_ROWS", "50000"))
+INDEX_RETRAIN_FACTOR = float(os.getenv("INDEX_RETRAIN_FACTOR", "4"))
+INDEX_MAX_PARTITIONS = int(os.getenv("INDEX_MAX_PARTITIONS", "4096"))
+SEARCH_NPROBES = int(os.getenv("SEARCH_NPROBES", "20"))
+SEARCH_REFINE_FACTOR = int(os.getenv("SEARCH_REFINE_FACTOR", "10"))
+# Delta-check : filtre de Bloom des hashes indexés (capacité initiale, taux de faux positifs)
+HASH_FILTER_CAPACITY = int(os.getenv("HASH_FILTER_CAPACITY", "10000000"))
+HASH_FILTER_ERROR_RATE = float(os.getenv("HASH_FILTER_ERROR_RATE", "0.001"))
+# Cache disque des embeddings (clé : modèle, modalité, hash du contenu), éviction LRU
+EMBEDDING_CACHE_ENABLED = os.getenv("EMBEDDING_CACHE_ENABLED", "1") == "1"
+EMBEDDING_CACHE_SIZE = int(os.getenv("EMBEDDING_CACHE_SIZE", "500000"))
+# Texte : budget de tokens (taille du sous-batch x longueur max) par passe CLIP
+TEXT_TOKEN_BUDGET = int(os.getenv("TEXT_TOKEN_BUDGET", "8192"))
+# Backend CLIP CPU : "torch", "onnx" (fp32) ou "onnx-int8" ; activé seulement si la parité est validée
+CLIP_BACKEND = os.getenv("CLIP_BACKEND", "torch")
+ONNX_THREADS = int(os.getenv("ONNX_THREADS", "0"))
+ONNX_PARITY_MIN_COSINE = float(os.getenv("ONNX_PARITY_MIN_COSINE", "0.98"))
+# Pool d'inférence CLIP : nb de processus (-1 = auto : 0 sur GPU, cpu/4 plafonné à 4 sur CPU), threads chacun
+EMBED_WORKERS = int(os.getenv("EMBED_WORKERS", "-1"))
+EMBED_THREADS = int(os.getenv("EMBED_THREADS", "2"))
 
 # --- LLM CONFIGURATION ---
 OLLAMA_HOST = os.getenv("OLLAMA_HOST", "localhost")
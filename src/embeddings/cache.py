@@ -0,0 +1,139 @@
+# src/embeddings/cache.py
+import re
+import time
+import sqlite3
+import hashlib
+import threading
+import numpy as np
+from src import config
+from src.utils.logger import setup_logger
+
+logger = setup_logger("EmbeddingCache")
+
+class EmbeddingCache:
+    """
+    Cache disque des embeddings, adressé par contenu : clé = (modèle, modalité, hash du contenu).
+    - Vecteurs : fichier float32 (capacité x dim) mappé en mémoire, un slot par entrée.
+    - Index : SQLite (clé -> slot, dernier accès) ; au-delà de la capacité, éviction LRU.
+    Un vecteur est écrit dans son slot AVANT que la clé ne soit visible (transaction SQLite).
+    """
+
+    def __init__(self, model_name, dim, capacity, root=None):
+        root = root or config.EMBEDDING_CACHE_DIR
+        slug = re.sub(r"[^A-Za-z0-9_.-]+", "_", model_name)
+        directory = root / slug
+        directory.mkdir(parents=True, exist_ok=True)
+
+        self.dim = dim
+        self.capacity = capacity
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(str(directory / "index.db"), timeout=30, check_same_thread=False)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("CREATE TABLE IF NOT EXISTS entries (key TEXT PRIMARY KEY, slot INTEGER UNIQUE, last_used REAL)")
+        self._db.execute("CREATE INDEX IF NOT EXISTS idx_last_used ON entries(last_used)")
+        self._db.commit()
+
+        path = directory / f"vectors_{dim}.f32"
+        mode = "r+" if path.exists() and path.stat().st_size == capacity * dim * 4 else "w+"
+        if mode == "w+":
+            # Capacité modifiée (ou premier lancement) : l'index ne correspond plus au fichier
+            self._db.execute("DELETE FROM entries")
+            self._db.commit()
+        self._vectors = np.memmap(path, dtype=np.float32, mode=mode, shape=(capacity, dim))
+
+    @staticmethod
+    def key(modality, payload):
+        """Empreinte du contenu (texte nettoyé ou octets de l'image prétraitée)."""
+        data = payload.encode("utf-8") if isinstance(payload, str) else payload
+        return f"{modality}:{hashlib.blake2b(data, digest_size=16).hexdigest()}"
+
+    def get_many(self, keys):
+        """
+        {index dans keys: vecteur} pour les clés présentes (et rafraîchit leur date d'accès).
+        Lookup et lecture des slots sous le même verrou d'écriture SQLite (BEGIN IMMEDIATE) :
+        un autre processus ne peut pas évincer/réécrire un slot entre les deux.
+        """
+        if not keys: return {}
+        found = {}
+        with self._lock:
+            try:
+                self._db.execute("BEGIN IMMEDIATE")
+                slots = {}
+                for i in range(0, len(keys), 500):
+                    chunk = list(set(keys[i:i + 500]))
+                    marks = ",".join("?" * len(chunk))
+                    slots.update(self._db.execute(f"SELECT key, slot FROM entries WHERE key IN ({marks})", chunk))
+                for i, k in enumerate(keys):
+                    if k in slots:
+                        found[i] = np.array(self._vectors[slots[k]])
+                if slots:
+                    now = time.time()
+                    self._db.executemany("UPDATE entries SET last_used = ? WHERE key = ?", [(now, k) for k in slots])
+                self._db.commit()
+            except Exception as e:
+                self._db.rollback()
+                logger.warning(f"Lecture du cache d'embeddings impossible : {e}")
+                return {}
+        return found
+
+    def put_many(self, keys, vectors):
+        """Enregistre les vecteurs calculés (éviction LRU si le cache est plein)."""
+        items = {k: v for k, v in zip(keys, vectors) if v is not None}
+        if not items: return
+        with self._lock:
+            try:
+                self._db.execute("BEGIN IMMEDIATE")
+                existing = self._db.execute(
+                    f"SELECT key FROM entries WHERE key IN ({','.join('?' * len(items))})", list(items)
+                ).fetchall()
+                for (k,) in existing:
+                    items.pop(k, None)
+                if not items:
+                    self._db.commit()
+                    return
+
+                slots = self._allocate(len(items))
+                now = time.time()
+                for slot, vec in zip(slots, items.values()):
+                    self._vectors[slot] = vec
+                self._vectors.flush()
+                self._db.executemany("INSERT INTO entries (key, slot, last_used) VALUES (?, ?, ?)",
+                                     [(k, slot, now) for k, slot in zip(items, slots)])
+                self._db.commit()
+            except Exception as e:
+                self._db.rollback()
+                logger.warning(f"Écriture du cache d'embeddings impossible : {e}")
+
+    def _allocate(self, n):
+        """Slots libres d'abord, puis les moins récemment utilisés (évincés)."""
+        n = min(n, self.capacity)
+        used = self._db.execute("SELECT COUNT(*) FROM entries").fetchone()[0]
+        free = []
+        if used < self.capacity:
+            taken = self._db.execute("SELECT COALESCE(MAX(slot), -1) FROM entries").fetchone()[0]
+            # Les slots sont alloués séquentiellement : tout ce qui suit le max est libre
+            free = list(range(taken + 1, min(taken + 1 + n, self.capacity)))
+        missing = n - len(free)
+        if missing > 0:
+            victims = self._db.execute(
+                "SELECT key, slot FROM entries ORDER BY last_used LIMIT ?", (missing,)
+            ).fetchall()
+            self._db.executemany("DELETE FROM entries WHERE key = ?", [(k,) for k, _ in victims])
+            free += [slot for _, slot in victims]
+        return free
+
+_caches = {}
+_caches_lock = threading.Lock()
+
+def get_cache(model_name, dim):
+    """Cache du modèle (None si désactivé ou indisponible)."""
+    if not config.EMBEDDING_CACHE_ENABLED:
+        return None
+    with _caches_lock:
+        if model_name not in _caches:
+            try:
+                _caches[model_name] = EmbeddingCache(model_name, dim, config.EMBEDDING_CACHE_SIZE)
+            except Exception as e:
+                logger.warning(f"Cache d'embeddings désactivé : {e}")
+                _caches[model_name] = None
+        return _caches[model_name]
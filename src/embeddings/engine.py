@@ -0,0 +1,147 @@
+# src/embeddings/engine.py
+import threading
+import multiprocessing
+import numpy as np
+import torch
+from transformers import CLIPModel, CLIPProcessor
+from src import config
+from src.utils.preprocessing import clean_text
+from src.embeddings.cache import get_cache
+from src.embeddings.onnx_backend import load_backend
+
+class ClipEngine:
+    """
+    Moteur CLIP unique du processus : UNE copie des poids pour le texte et l'image
+    (tokenizer et preprocessing image partagés via CLIPProcessor).
+    """
+
+    def __init__(self, model_name=None, device=None, backend=None, threads=None):
+        self.model_name = model_name or config.IMAGE_MODEL_NAME
+        self.device = device or _default_device()
+        self.processor = CLIPProcessor.from_pretrained(self.model_name)
+        self.tokenizer = self.processor.tokenizer
+
+        # Backend ONNX Runtime (CPU) si demandé et validé par la parité ; sinon PyTorch
+        # `threads` : budget de threads du processus (pool d'inférence), prioritaire sur ONNX_THREADS
+        backend = backend or config.CLIP_BACKEND
+        self.backend = load_backend(backend, self.model_name, threads) if backend != "torch" and self.device == "cpu" else None
+        self.model = None
+        if self.backend is None:
+            self.model = CLIPModel.from_pretrained(self.model_name).to(self.device)
+            self.model.eval()
+        self._tensors = "np" if self.backend else "pt"
+        # Vecteurs ONNX/int8 légèrement différents : espace de cache distinct
+        self.cache_name = f"{self.model_name}-{self.backend.precision}" if self.backend else self.model_name
+
+    @staticmethod
+    def _normalize(features):
+        # Normalisation L2 
+        features = features / features.norm(p=2, dim=-1, keepdim=True)
+        return features.cpu().numpy()
+
+    def _with_cache(self, modality, items, payloads, encode):
+        """Consulte le cache disque ; seuls les contenus jamais vus passent par le modèle."""
+        cache = get_cache(self.cache_name, config.EMBEDDING_DIM)
+        if cache is None:
+            return encode(items)
+        keys = [cache.key(modality, p) for p in payloads]
+        vectors = cache.get_many(keys)
+        missing = [i for i in range(len(items)) if i not in vectors]
+        if missing:
+            computed = encode([items[i] for i in missing])
+            cache.put_many([keys[i] for i in missing], computed)
+            vectors.update(zip(missing, computed))
+        return np.stack([vectors[i] for i in range(len(items))]).astype(np.float32, copy=False)
+
+    def _encode_texts(self, cleans):
+        """
+        Tokenisation sans padding, tri par longueur puis sous-batches bornés par un budget
+        de tokens (taille x plus longue séquence) : un long texte ne fait plus padder
+        tous les labels courts jusqu'à 77 tokens. Ordre d'origine restauré en sortie.
+        """
+        encoded = self.tokenizer(cleans, truncation=True, max_length=77)
+        ids, masks = encoded["input_ids"], encoded["attention_mask"]
+        order = sorted(range(len(cleans)), key=lambda i: len(ids[i]))
+
+        output = np.empty((len(cleans), config.EMBEDDING_DIM), dtype=np.float32)
+        start = 0
+        while start < len(order):
+            # Trié par longueur croissante : la dernière séquence ajoutée est la plus longue
+            end = start + 1
+            while end < len(order) and (end + 1 - start) * len(ids[order[end]]) <= config.TEXT_TOKEN_BUDGET:
+                end += 1
+            bucket = order[start:end]
+            inputs = self.tokenizer.pad(
+                {"input_ids": [ids[i] for i in bucket], "attention_mask": [masks[i] for i in bucket]},
+                return_tensors=self._tensors
+            )
+            output[bucket] = self._text_features(inputs)
+            start = end
+        return output
+
+    def _text_features(self, inputs):
+        if self.backend:
+            return self.backend.text_features(inputs["input_ids"], inputs["attention_mask"])
+        with torch.no_grad():
+            return self._normalize(self.model.get_text_features(**inputs.to(self.device)))
+
+    def _encode_images(self, pil_images):
+        inputs = self.processor(images=pil_images, return_tensors=self._tensors)
+        if self.backend:
+            return self.backend.image_features(inputs["pixel_values"])
+        with torch.no_grad():
+            return self._normalize(self.model.get_image_features(**inputs.to(self.device)))
+
+    def embed_text_batch(self, texts):
+        if not texts: return []
+        cleans = [clean_text(str(t)) if t is not None else "" for t in texts]
+        return self._with_cache("text", cleans, cleans, self._encode_texts)
+
+    def embed_image_batch(self, pil_images):
+        # Filtrage : On retire les None avant d'appeler le modèle
+        valid_imgs = [img for img in pil_images if img is not None]
+        if not valid_imgs: return []
+        # Clé image : pixels décodés (+ dimensions), indépendante du chemin du fichier
+        payloads = [f"{img.width}x{img.height}:".encode() + img.tobytes() for img in valid_imgs]
+        return self._with_cache("image", valid_imgs, payloads, self._encode_images)
+
+    def embed_multimodal_batch(self, texts, pil_images):
+        """Texte + image d'un même batch avec le même modèle : (vecteurs texte, vecteurs image)."""
+        return self.embed_text_batch(texts), self.embed_image_batch(pil_images)
+
+def _default_device():
+    # Les workers d'ingestion restent sur CPU (le GPU est réservé au processus principal)
+    current_proc = multiprocessing.current_process().name
+    is_worker = any(x in current_proc for x in ["Process-", "ForkPoolWorker", "engine_ingest"])
+    return "cpu" if is_worker else config.DEVICE
+
+_engine = None
+_engine_lock = threading.Lock()
+
+def get_engine():
+    """Singleton du processus (thread-safe : les étages du pipeline peuvent l'appeler en parallèle)."""
+    global _engine
+    if _engine is None:
+        with _engine_lock:
+            if _engine is None:
+                _engine = ClipEngine()
+    return _engine
+
+def embed_text_batch(texts):
+    return get_engine().embed_text_batch(texts)
+
+def embed_image_batch(pil_images):
+    return get_engine().embed_image_batch(pil_images)
+
+def embed_multimodal_batch(texts, pil_images):
+    return get_engine().embed_multimodal_batch(texts, pil_images)
+
+def embed_text(text):
+    if not text: return np.zeros(config.EMBEDDING_DIM)
+    return embed_text_batch([text])[0]
+
+def embed_image(pil_image):
+    if pil_image is None:
+        return np.zeros(config.EMBEDDING_DIM)
+    res = embed_image_batch([pil_image])
+    return res[0] if len(res) > 0 else np.zeros(config.EMBEDDING_DIM)
@@ -0,0 +1,256 @@
+# src/embeddings/onnx_backend.py
+import os
+import re
+import json
+import time
+import numpy as np
+from src import config
+from src.utils.logger import setup_logger
+
+logger = setup_logger("OnnxBackend")
+
+# Variantes disponibles : fp32 exporté, int8 (quantification dynamique des poids)
+VARIANTS = {"onnx": "fp32", "onnx-int8": "int8"}
+PARITY_REPORT = "parity.json"
+
+# Échantillons de la vérification de parité (textes courts / longs, images synthétiques)
+PARITY_TEXTS = [
+    "a photo of a dog", "chest x-ray with pleural effusion", "pizza margherita",
+    "invoice total amount due", "label", "apple",
+    "a long description of a medical report mentioning several findings and a follow-up recommendation",
+]
+# Échantillon réel (`onnx --parity-only --sample DIR`) : fichiers lus par modalité
+PARITY_IMAGE_EXTENSIONS = {".png", ".jpg", ".jpeg", ".bmp", ".tiff", ".webp"}
+PARITY_TEXT_EXTENSIONS = {".txt", ".csv", ".tsv"}
+PARITY_SAMPLE_SIZE = 32
+
+def onnx_dir(model_name=None):
+    slug = re.sub(r"[^A-Za-z0-9_.-]+", "_", model_name or config.IMAGE_MODEL_NAME)
+    path = config.ONNX_DIR / slug
+    path.mkdir(parents=True, exist_ok=True)
+    return path
+
+def _l2(features):
+    norms = np.linalg.norm(features, axis=-1, keepdims=True)
+    return (features / np.where(norms > 0, norms, 1.0)).astype(np.float32)
+
+# --- EXPORT ---
+def export_onnx(quantize=True, model_name=None):
+    """Exporte les tours texte et vision de CLIP en ONNX (+ variantes int8)."""
+    import torch
+    from PIL import Image
+    from transformers import CLIPModel, CLIPProcessor
+
+    model_name = model_name or config.IMAGE_MODEL_NAME
+    out = onnx_dir(model_name)
+    model = CLIPModel.from_pretrained(model_name).eval()
+    processor = CLIPProcessor.from_pretrained(model_name)
+
+    class TextTower(torch.nn.Module):
+        def __init__(self, clip):
+            super().__init__()
+            self.clip = clip
+
+        def forward(self, input_ids, attention_mask):
+            return self.clip.get_text_features(input_ids=input_ids, attention_mask=attention_mask)
+
+    class VisionTower(torch.nn.Module):
+        def __init__(self, clip):
+            super().__init__()
+            self.clip = clip
+
+        def forward(self, pixel_values):
+            return self.clip.get_image_features(pixel_values=pixel_values)
+
+    text_inputs = processor.tokenizer(PARITY_TEXTS[:2], padding=True, return_tensors="pt")
+    pixel_values = processor(images=[Image.new("RGB", (224, 224))], return_tensors="pt")["pixel_values"]
+
+    with torch.no_grad():
+        torch.onnx.export(
+            TextTower(model), (text_inputs["input_ids"], text_inputs["attention_mask"]),
+            str(out / "text_fp32.onnx"), input_names=["input_ids", "attention_mask"], output_names=["features"],
+            dynamic_axes={"input_ids": {0: "batch", 1: "seq"}, "attention_mask": {0: "batch", 1: "seq"},
+                          "features": {0: "batch"}},
+            opset_version=17
+        )
+        torch.onnx.export(
+            VisionTower(model), (pixel_values,),
+            str(out / "vision_fp32.onnx"), input_names=["pixel_values"], output_names=["features"],
+            dynamic_axes={"pixel_values": {0: "batch"}, "features": {0: "batch"}},
+            opset_version=17
+        )
+    logger.info(f"Export ONNX fp32 terminé : {out}")
+
+    if quantize:
+        from onnxruntime.quantization import quantize_dynamic, QuantType
+        for tower in ("text", "vision"):
+            quantize_dynamic(str(out / f"{tower}_fp32.onnx"), str(out / f"{tower}_int8.onnx"),
+                             weight_type=QuantType.QInt8)
+        logger.info("Quantification dynamique int8 terminée.")
+    return out
+
+# --- INFÉRENCE ---
+class OnnxClipBackend:
+    """Tours CLIP exécutées par ONNX Runtime (CPU), mêmes entrées que le modèle PyTorch."""
+
+    def __init__(self, precision="fp32", model_name=None, threads=None):
+        import onnxruntime as ort
+        out = onnx_dir(model_name)
+        options = ort.SessionOptions()
+        threads = threads or config.ONNX_THREADS
+        if threads > 0:
+            options.intra_op_num_threads = threads
+        options.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+        providers = ["CPUExecutionProvider"]
+        self.precision = precision
+        self.text = ort.InferenceSession(str(out / f"text_{precision}.onnx"), options, providers=providers)
+        self.vision = ort.InferenceSession(str(out / f"vision_{precision}.onnx"), options, providers=providers)
+
+    def text_features(self, input_ids, attention_mask):
+        feeds = {"input_ids": np.asarray(input_ids, dtype=np.int64),
+                 "attention_mask": np.asarray(attention_mask, dtype=np.int64)}
+        return _l2(self.text.run(["features"], feeds)[0])
+
+    def image_features(self, pixel_values):
+        feeds = {"pixel_values": np.asarray(pixel_values, dtype=np.float32)}
+        return _l2(self.vision.run(["features"], feeds)[0])
+
+def load_backend(name, model_name=None, threads=None):
+    """
+    Backend ONNX demandé par CLIP_BACKEND, seulement si sa vérification de parité est passée.
+    Renvoie None (repli PyTorch) sinon.
+    """
+    precision = VARIANTS.get(name)
+    if precision is None:
+        return None
+    try:
+        report = json.loads((onnx_dir(model_name) / PARITY_REPORT).read_text(encoding="utf-8"))
+        result = report.get(precision, {})
+        if not result.get("passed"):
+            logger.warning(f"Backend {name} : parité non validée (lancer `python -m src.main onnx`). Repli PyTorch.")
+            return None
+        backend = OnnxClipBackend(precision, model_name, threads)
+        logger.info(f"Backend CLIP : ONNX Runtime {precision} (cosinus min {result['min_cosine']:.4f}, "
+                    f"x{result['speedup']:.2f} vs PyTorch)")
+        return backend
+    except FileNotFoundError:
+        logger.warning(f"Backend {name} : modèles ONNX absents (lancer `python -m src.main onnx`). Repli PyTorch.")
+    except ImportError:
+        logger.warning("onnxruntime n'est pas installé : repli sur PyTorch.")
+    except Exception as e:
+        logger.warning(f"Backend {name} indisponible ({e}) : repli PyTorch.")
+    return None
+
+# --- VÉRIFICATION DE PARITÉ ---
+def _load_parity_sample(sample_dir, limit=PARITY_SAMPLE_SIZE):
+    """Textes (lignes non vides) et images réels d'un dossier de dataset, tirage déterministe."""
+    from PIL import Image
+    image_paths, text_paths = [], []
+    for root, _, files in os.walk(sample_dir):
+        for name in sorted(files):
+            ext = os.path.splitext(name)[1].lower()
+            if ext in PARITY_IMAGE_EXTENSIONS: image_paths.append(os.path.join(root, name))
+            elif ext in PARITY_TEXT_EXTENSIONS: text_paths.append(os.path.join(root, name))
+
+    rng = np.random.default_rng(0)
+    images = []
+    for path in rng.permutation(sorted(image_paths))[:limit]:
+        try:
+            with Image.open(path) as img:
+                images.append(img.convert("RGB"))
+        except Exception as e:
+            logger.warning(f"Image d'échantillon illisible ({path}) : {e}")
+
+    texts = []
+    for path in rng.permutation(sorted(text_paths)):
+        try:
+            with open(path, encoding="utf-8", errors="ignore") as f:
+                texts += [line.strip()[:300] for _, line in zip(range(200), f) if line.strip()]
+        except OSError:
+            continue
+        if len(texts) >= limit * 4: break
+    if texts:
+        texts = [texts[i] for i in sorted(rng.choice(len(texts), min(limit, len(texts)), replace=False))]
+    return texts, images
+
+def _timed(fn, repeats):
+    start = time.perf_counter()
+    for _ in range(repeats):
+        result = fn()
+    return result, (time.perf_counter() - start) / repeats * 1000
+
+def parity_check(model_name=None, repeats=5, sample_dir=None, threads=None):
+    """
+    Compare chaque variante ONNX à PyTorch fp32 sur les mêmes entrées :
+    dérive cosinus (min / moyenne) et débit CPU. Le rapport conditionne l'activation du backend.
+    - `sample_dir` : textes et images réels d'un dataset ajoutés aux échantillons synthétiques.
+    - Les deux backends tournent avec le même nombre de threads (sinon le speedup mesure surtout
+      l'écart entre OMP_NUM_THREADS=1 et les threads par défaut d'ONNX Runtime).
+    """
+    import torch
+    from PIL import Image
+    from transformers import CLIPModel, CLIPProcessor
+
+    model_name = model_name or config.IMAGE_MODEL_NAME
+    threads = threads or (config.ONNX_THREADS if config.ONNX_THREADS > 0 else (os.cpu_count() or 1))
+    model = CLIPModel.from_pretrained(model_name).eval()
+    processor = CLIPProcessor.from_pretrained(model_name)
+
+    rng = np.random.default_rng(0)
+    images = [Image.fromarray(rng.integers(0, 255, (224, 224, 3), dtype=np.uint8)) for _ in range(4)]
+    images += [Image.new("RGB", (224, 224), color) for color in ("white", "red")]
+    texts = list(PARITY_TEXTS)
+    if sample_dir:
+        sample_texts, sample_images = _load_parity_sample(sample_dir)
+        logger.info(f"Échantillon réel ({sample_dir}) : {len(sample_texts)} textes, {len(sample_images)} images.")
+        texts += sample_texts
+        images += sample_images
+
+    text_pt = processor.tokenizer(texts, padding=True, truncation=True,
+                                  max_length=processor.tokenizer.model_max_length, return_tensors="pt")
+    pixels_pt = processor(images=images, return_tensors="pt")["pixel_values"]
+    previous_threads = torch.get_num_threads()
+    torch.set_num_threads(threads)
+
+    def torch_run():
+        with torch.no_grad():
+            t = model.get_text_features(**text_pt).numpy()
+            v = model.get_image_features(pixel_values=pixels_pt).numpy()
+        return _l2(np.concatenate([t, v]))
+
+    try:
+        reference, torch_ms = _timed(torch_run, repeats)
+    finally:
+        torch.set_num_threads(previous_threads)
+
+    report = {}
+    for precision in VARIANTS.values():
+        try:
+            backend = OnnxClipBackend(precision, model_name, threads)
+        except Exception as e:
+            logger.warning(f"Variante {precision} ignorée : {e}")
+            continue
+
+        def onnx_run():
+            t = backend.text_features(text_pt["input_ids"].numpy(), text_pt["attention_mask"].numpy())
+            v = backend.image_features(pixels_pt.numpy())
+            return np.concatenate([t, v])
+
+        candidate, onnx_ms = _timed(onnx_run, repeats)
+        cosines = np.sum(reference * candidate, axis=1)
+        report[precision] = {
+            "min_cosine": float(cosines.min()),
+            "mean_cosine": float(cosines.mean()),
+            "torch_ms": round(torch_ms, 2),
+            "onnx_ms": round(onnx_ms, 2),
+            "speedup": round(torch_ms / onnx_ms, 2) if onnx_ms else 0.0,
+            "threads": threads,
+            "samples": {"texts": len(texts), "images": len(images), "real": bool(sample_dir)},
+            "passed": bool(cosines.min() >= config.ONNX_PARITY_MIN_COSINE),
+        }
+        logger.info(f"Parité {precision} : cosinus min {cosines.min():.4f} / moyen {cosines.mean():.4f} | "
+                    f"{torch_ms:.1f} ms PyTorch vs {onnx_ms:.1f} ms ONNX (x{report[precision]['speedup']})"
+                    f" -> {'OK' if report[precision]['passed'] else 'REFUSÉ'}")
+
+    (onnx_dir(model_name) / PARITY_REPORT).write_text(json.dumps(report, indent=4), encoding="utf-8")
+    return report
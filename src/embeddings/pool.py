@@ -0,0 +1,121 @@
+# src/embeddings/pool.py
+import os
+import threading
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from src import config
+from src.utils.logger import setup_logger
+
+logger = setup_logger("EmbeddingPool")
+
+# Moteur CLIP propre à chaque processus d'inférence (chargé une fois par processus)
+_WORKER_ENGINE = None
+# Reconstructions tolérées (processus tué : OOM, crash) avant repli dans le processus principal
+MAX_RESTARTS = 3
+
+def _init_embed_worker(threads):
+    """
+    Chaque processus d'inférence a son propre budget de threads (OMP_NUM_THREADS=1 ailleurs),
+    appliqué à PyTorch comme aux sessions ONNX Runtime (CLIP_BACKEND=onnx*).
+    """
+    global _WORKER_ENGINE
+    import torch
+    from src.embeddings.engine import ClipEngine
+    torch.set_num_threads(threads)
+    _WORKER_ENGINE = ClipEngine(device="cpu", threads=threads)
+
+def _embed_job(texts, images):
+    return _WORKER_ENGINE.embed_multimodal_batch(texts, images)
+
+def default_embed_workers():
+    """0 = inférence dans le processus principal (GPU) ; sinon quelques processus CPU."""
+    if config.EMBED_WORKERS >= 0:
+        return config.EMBED_WORKERS
+    import torch
+    if torch.cuda.is_available():
+        return 0
+    return max(1, min(4, (os.cpu_count() or 1) // 4))
+
+class EmbeddingPool:
+    """
+    Pool de processus d'inférence CLIP (CPU) alimenté par l'étage Vectorisation du pipeline.
+    Les batches sont soumis sans attendre : plusieurs s'exécutent en parallèle, un par processus.
+    """
+
+    def __init__(self, workers=None, threads=None):
+        self.workers = workers if workers is not None else default_embed_workers()
+        self.threads = threads or config.EMBED_THREADS
+        self.restarts = 0
+        self._executor = None
+        self._lock = threading.Lock()
+
+    def _create_executor(self):
+        return ProcessPoolExecutor(
+            max_workers=self.workers,
+            mp_context=multiprocessing.get_context("spawn"),
+            initializer=_init_embed_worker,
+            initargs=(self.threads,)
+        )
+
+    def start(self):
+        if self._executor is None and self.workers > 0:
+            self._executor = self._create_executor()
+            logger.info(f"Pool d'inférence CLIP : {self.workers} processus x {self.threads} threads.")
+        return self
+
+    @property
+    def active(self):
+        return self._executor is not None
+
+    def _restart_locked(self, broken):
+        """Remplace un executor cassé (une seule fois, même si plusieurs batches le constatent)."""
+        if self._executor is not broken:
+            return
+        broken.shutdown(wait=False, cancel_futures=True)
+        self.restarts += 1
+        if self.restarts > MAX_RESTARTS:
+            logger.error(f"Pool d'inférence CLIP cassé {self.restarts} fois : repli dans le processus principal.")
+            self._executor = None
+            return
+        logger.warning(f"Processus d'inférence CLIP perdu : pool recréé ({self.restarts}/{MAX_RESTARTS}).")
+        self._executor = self._create_executor()
+
+    def submit(self, texts, images):
+        """Future -> (vecteurs texte, vecteurs image). Pool cassé : recréé avant soumission."""
+        with self._lock:
+            executor = self._executor
+            if executor is None:
+                raise BrokenProcessPool("Pool d'inférence CLIP désactivé")
+            try:
+                return executor.submit(_embed_job, texts, images)
+            except BrokenProcessPool:
+                self._restart_locked(executor)
+                if self._executor is None:
+                    raise
+                return self._executor.submit(_embed_job, texts, images)
+
+    def retry(self, texts, images):
+        """
+        Nouvelle tentative d'un batch dont le processus est mort : sur le pool recréé,
+        ou dans le processus principal si le pool a été désactivé.
+        """
+        try:
+            return self.submit(texts, images).result()
+        except BrokenProcessPool:
+            if self.active:
+                raise
+            from src.embeddings.engine import embed_multimodal_batch
+            return embed_multimodal_batch(texts, images)
+
+    def shutdown(self):
+        with self._lock:
+            if self._executor is not None:
+                self._executor.shutdown(wait=True, cancel_futures=True)
+                self._executor = None
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, exc_type, exc, tb):
+        self.shutdown()
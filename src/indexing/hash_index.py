@@ -0,0 +1,67 @@
+# src/indexing/hash_index.py
+import os
+import math
+import struct
+import hashlib
+
+# En-tête du fichier : magic, bits, nb de fonctions, capacité, éléments, version de table couverte
+_HEADER = struct.Struct("<8sQIQQq")
+_MAGIC = b"HASHBLM1"
+
+class HashBloomFilter:
+    """
+    Filtre de Bloom des file_hash indexés : mémoire fixe (quelques Mo), pas de faux négatifs.
+    Un « peut-être » doit être confirmé par un lookup exact dans LanceDB.
+    """
+
+    def __init__(self, capacity, error_rate, bits=None, count=0, version=-1):
+        self.capacity = max(1, int(capacity))
+        self.num_bits = int(math.ceil(-self.capacity * math.log(error_rate) / (math.log(2) ** 2)))
+        self.num_hashes = max(1, round(self.num_bits / self.capacity * math.log(2)))
+        self.bits = bits if bits is not None else bytearray((self.num_bits + 7) // 8)
+        self.count = count
+        self.version = version
+        self.dirty = False
+
+    def _positions(self, key):
+        # Double hachage (Kirsch-Mitzenmacher) sur un seul md5
+        digest = hashlib.md5(str(key).encode()).digest()
+        h1 = int.from_bytes(digest[:8], "little")
+        h2 = int.from_bytes(digest[8:], "little") | 1
+        return ((h1 + i * h2) % self.num_bits for i in range(self.num_hashes))
+
+    def add(self, key):
+        for pos in self._positions(key):
+            self.bits[pos >> 3] |= 1 << (pos & 7)
+        self.count += 1
+        self.dirty = True
+
+    def __contains__(self, key):
+        return all(self.bits[pos >> 3] & (1 << (pos & 7)) for pos in self._positions(key))
+
+    @property
+    def saturated(self):
+        return self.count > self.capacity
+
+    # --- PERSISTANCE ---
+    def save(self, path):
+        tmp = f"{path}.tmp"
+        with open(tmp, "wb") as f:
+            f.write(_HEADER.pack(_MAGIC, self.num_bits, self.num_hashes, self.capacity, self.count, self.version))
+            f.write(self.bits)
+        os.replace(tmp, path)
+        self.dirty = False
+
+    @classmethod
+    def load(cls, path, error_rate):
+        with open(path, "rb") as f:
+            magic, num_bits, num_hashes, capacity, count, version = _HEADER.unpack(f.read(_HEADER.size))
+            if magic != _MAGIC:
+                raise ValueError("Fichier de filtre invalide")
+            bloom = cls(capacity, error_rate, count=count, version=version)
+            if (bloom.num_bits, bloom.num_hashes) != (num_bits, num_hashes):
+                raise ValueError("Paramètres du filtre modifiés")
+            bloom.bits = bytearray(f.read())
+        if len(bloom.bits) != (num_bits + 7) // 8:
+            raise ValueError("Filtre tronqué")
+        return bloom
@@ -0,0 +1,119 @@
+# src/indexing/maintenance.py
+import os
+import time
+from datetime import timedelta
+from src import config
+from src.utils.logger import setup_logger
+from src.indexing.vector_store import get_store, flush_writes, create_scalar_indexes
+
+logger = setup_logger("Maintenance")
+
+# Tables entretenues (le catalogue + les contrats, réécrits à chaque archive)
+MAINTAINED_TABLES = (config.TABLE_NAME, "folder_contracts")
+
+def _table_dir(name):
+    return config.LANCEDB_URI / f"{name}.lance"
+
+def _disk_size(path):
+    total = 0
+    for root, _, files in os.walk(path):
+        for f in files:
+            try:
+                total += os.path.getsize(os.path.join(root, f))
+            except OSError:
+                pass
+    return total
+
+def collect_stats(table, name):
+    """Fragments, lignes supprimées (deletion files) et lignes hors index vectoriel."""
+    stats = {"fragments": 0, "rows": 0, "deleted_rows": 0, "unindexed_rows": 0,
+             "bytes": _disk_size(_table_dir(name))}
+    try:
+        dataset = table.to_lance()
+        for fragment in dataset.get_fragments():
+            stats["fragments"] += 1
+            deletion = fragment.metadata.deletion_file
+            if deletion is not None:
+                stats["deleted_rows"] += deletion.num_deleted_rows or 0
+        stats["rows"] = dataset.count_rows()
+    except Exception as e:
+        logger.warning(f"Statistiques fragments indisponibles ({name}) : {e}")
+
+    try:
+        for index in table.list_indices():
+            index_stats = table.index_stats(index.name)
+            if index_stats is not None:
+                stats["unindexed_rows"] = max(stats["unindexed_rows"], index_stats.num_unindexed_rows)
+    except Exception as e:
+        logger.warning(f"Statistiques d'index indisponibles ({name}) : {e}")
+    return stats
+
+def maintenance_reasons(stats):
+    """Déclencheurs : nombre de fragments, ratio de lignes supprimées, ratio de lignes non indexées."""
+    reasons = []
+    physical = max(1, stats["rows"] + stats["deleted_rows"])
+    if stats["fragments"] > config.MAINT_MAX_FRAGMENTS:
+        reasons.append(f"{stats['fragments']} fragments")
+    if stats["deleted_rows"] / physical > config.MAINT_DELETED_RATIO:
+        reasons.append(f"{stats['deleted_rows']} lignes supprimées")
+    if stats["rows"] and stats["unindexed_rows"] / stats["rows"] > config.MAINT_UNINDEXED_RATIO:
+        reasons.append(f"{stats['unindexed_rows']} lignes hors index")
+    return reasons
+
+def _optimize(table):
+    """Compaction + purge des anciennes versions + rattrapage des index."""
+    keep = timedelta(days=config.MAINT_KEEP_VERSIONS_DAYS)
+    if hasattr(table, "optimize"):
+        table.optimize(cleanup_older_than=keep)
+        return
+    # Anciennes versions de lancedb : les trois opérations séparément
+    table.compact_files()
+    table.cleanup_old_versions(older_than=keep)
+    dataset = table.to_lance()
+    if dataset.list_indices():
+        dataset.optimize.optimize_indices()
+
+def maintain_table(name, force=False):
+    """Entretient une table si un déclencheur est atteint (ou si `force`) et renvoie le rapport."""
+    table = get_store().table(name)
+    before = collect_stats(table, name)
+    reasons = maintenance_reasons(before)
+    if not reasons and not force:
+        logger.info(f"{name} : aucune maintenance requise ({before['fragments']} fragments).")
+        return None
+
+    logger.info(f"{name} : maintenance ({', '.join(reasons) or 'forcée'})...")
+    start = time.time()
+    _optimize(table)
+    duration = time.time() - start
+
+    after = collect_stats(get_store().table(name), name)
+    report = {
+        "table": name,
+        "duration": duration,
+        "fragments": (before["fragments"], after["fragments"]),
+        "deleted_rows_purged": before["deleted_rows"] - after["deleted_rows"],
+        "rows_indexed": before["unindexed_rows"] - after["unindexed_rows"],
+        "bytes_saved": before["bytes"] - after["bytes"],
+    }
+    logger.info(
+        f"{name} : {duration:.2f}s | fragments {before['fragments']} -> {after['fragments']} | "
+        f"{report['deleted_rows_purged']} lignes supprimées purgées | "
+        f"{report['rows_indexed']} lignes rattrapées par l'index | "
+        f"{report['bytes_saved'] / (1024 * 1024):.1f} Mo libérés"
+    )
+    return report
+
+def run_maintenance(force=False):
+    """Point d'entrée (commande `maintain`, watcher, fin d'ingestion)."""
+    flush_writes()
+    # Bases antérieures aux index scalaires : création des index manquants
+    create_scalar_indexes()
+    reports = []
+    for name in MAINTAINED_TABLES:
+        try:
+            report = maintain_table(name, force=force)
+            if report: reports.append(report)
+        except Exception as e:
+            logger.error(f"Échec maintenance {name} : {e}")
+    return reports
@@ -1,22 +1,52 @@
 # src/indexing/vector_store.py
 import lancedb
 import pyarrow as pa
-import pandas as pd
 import numpy as np
 import json
-import os
 from src import config
 from src.utils.logger import setup_logger
+from src.indexing.hash_index import HashBloomFilter
 import time 
 import random
+import atexit
+import threading
 
 logger = setup_logger("VectorStore")
 
 MAX_RETRIES = 5
+# Taille des lots de confirmation exacte (clause IN) du delta-check
+HASH_LOOKUP_CHUNK = 500
 BASE_DELAY = 0.2  
 
 _db_connection = None
 
+# Schéma de la Table principale (Vecteurs + Métadonnées)
+CATALOG_SCHEMA = pa.schema([
+    pa.field("vector", pa.list_(pa.float32(), config.EMBEDDING_DIM)),
+    pa.field("source", pa.string()),
+    pa.field("file_hash", pa.string()),
+    pa.field("type", pa.string()),
+    pa.field("domain", pa.string()),
+    pa.field("label", pa.string()),
+    pa.field("domain_score", pa.float32()),
+    pa.field("content", pa.string()),
+    pa.field("snippet", pa.string()),
+    pa.field("visual_pure", pa.list_(pa.float32(), 512)),   
+    pa.field("image_linked", pa.string()), 
+    pa.field("extra", pa.string())  
+])
+
+# Index scalaires des colonnes utilisées dans les prédicats where()
+SCALAR_INDEXES = {
+    config.TABLE_NAME: {"file_hash": "BTREE", "source": "BTREE",
+                        "domain": "BITMAP", "type": "BITMAP"},
+    "folder_contracts": {"folder_path": "BTREE"},
+}
+
+# Métrique par colonne vecteur : visual_pure reste en L2 (vecteur nul pour les lignes sans image,
+# indéfini en cosinus ; en L2 il est à distance 1 d'une requête normalisée, donc score visuel nul)
+VECTOR_METRICS = {"vector": "cosine", "visual_pure": "l2"}
+
 def get_db():
     """Singleton de connexion avec gestion de dossier automatique."""
     global _db_connection
@@ -25,27 +55,9 @@ def get_db():
         _db_connection = lancedb.connect(config.LANCEDB_URI)
     return _db_connection
 
-def init_tables():
-    """Initialise le catalogue et la table des contrats (Schémas Élite)."""
-    db = get_db()
-    
-    # 1. Schéma de la Table principale (Vecteurs + Métadonnées)
-    catalog_schema = pa.schema([
-        pa.field("vector", pa.list_(pa.float32(), config.EMBEDDING_DIM)),
-        pa.field("source", pa.string()),
-        pa.field("file_hash", pa.string()),
-        pa.field("type", pa.string()),
-        pa.field("domain", pa.string()),
-        pa.field("label", pa.string()),
-        pa.field("domain_score", pa.float32()),
-        pa.field("content", pa.string()),
-        pa.field("snippet", pa.string()),
-        pa.field("visual_pure", pa.list_(pa.float32(), 512)),   
-        pa.field("image_linked", pa.string()), 
-        pa.field("extra", pa.string())  
-    ])
-
-    # 2. Schéma des Contrats de dossier (Sans vecteur, pour la rapidité)
+def _create_tables(db):
+    """Crée le catalogue et la table des contrats s'ils n'existent pas (Schémas Élite)."""
+    # Schéma des Contrats de dossier (Sans vecteur, pour la rapidité)
     contract_schema = pa.schema([
         pa.field("folder_path", pa.string()),
         pa.field("signature", pa.string()),
@@ -54,55 +66,178 @@ def init_tables():
         pa.field("is_verified", pa.int32())
     ])
 
-    if config.TABLE_NAME not in db.table_names():
-        db.create_table(config.TABLE_NAME, schema=catalog_schema)
+    existing = set(db.table_names())
+    if config.TABLE_NAME not in existing:
+        db.create_table(config.TABLE_NAME, schema=CATALOG_SCHEMA)
     
-    if "folder_contracts" not in db.table_names():
+    if "folder_contracts" not in existing:
         db.create_table("folder_contracts", schema=contract_schema)
 
-    return db.open_table(config.TABLE_NAME)
+class CatalogStore:
+    """
+    Handles LanceDB ouverts une seule fois pour tout le processus + tampon d'écriture.
+    Les RecordBatch des batches d'ingestion sont accumulés jusqu'à WRITE_FLUSH_ROWS lignes
+    ou WRITE_FLUSH_BYTES octets : un commit (et un fragment) par seuil au lieu d'un par batch.
+    """
+
+    def __init__(self):
+        self._tables = {}
+        self._ready = False
+        self._pending = []
+        self._pending_rows = 0
+        self._pending_bytes = 0
+        # Lignes bufferisées (déjà comptées comme indexées) perdues par un commit en échec
+        self.failed_rows = 0
+        self._lock = threading.RLock()
+
+    def table(self, name=None):
+        """Handle ouvert (et mis en cache) d'une table ; crée les schémas au premier appel."""
+        name = name or config.TABLE_NAME
+        with self._lock:
+            if not self._ready:
+                _create_tables(get_db())
+                self._ready = True
+            if name not in self._tables:
+                self._tables[name] = get_db().open_table(name)
+            return self._tables[name]
+
+    def invalidate(self):
+        """Oublie les handles (tables supprimées, verrou fichier) : réouverture au prochain accès."""
+        with self._lock:
+            self._tables.clear()
+            self._ready = False
+
+    def write(self, batch):
+        """Bufferise un RecordBatch du catalogue ; commit dès qu'un seuil est atteint."""
+        with self._lock:
+            self._pending.append(batch)
+            self._pending_rows += batch.num_rows
+            self._pending_bytes += batch.nbytes
+            if self._pending_rows >= config.WRITE_FLUSH_ROWS or self._pending_bytes >= config.WRITE_FLUSH_BYTES:
+                self._flush_locked()
+        return batch.num_rows
+
+    def flush(self):
+        """Commit de tout le tampon (fin d'archive, fin de run, arrêt du processus)."""
+        with self._lock:
+            written = self._flush_locked()
+            _save_hash_filter()
+            return written
+
+    def discard(self):
+        with self._lock:
+            self._pending, self._pending_rows, self._pending_bytes = [], 0, 0
+
+    def _flush_locked(self):
+        if not self._pending: return 0
+        data = pa.Table.from_batches(self._pending, schema=CATALOG_SCHEMA)
+        self.discard()
+        written = _add_with_retry(self.table(), data, data.num_rows)
+        if written:
+            _track_hashes(data.column("file_hash").to_pylist(), self.table().count_rows())
+        if written < data.num_rows:
+            self.failed_rows += data.num_rows - written
+            logger.error(f"Commit du tampon en échec : {data.num_rows - written} lignes non écrites.")
+        return written
+
+_store = None
+
+def get_store():
+    """Singleton du store (flush automatique à l'arrêt du processus)."""
+    global _store
+    if _store is None:
+        _store = CatalogStore()
+        atexit.register(_store.flush)
+    return _store
+
+def init_tables():
+    """Initialise les tables si besoin et renvoie le handle (mis en cache) du catalogue."""
+    return get_store().table()
+
+def flush_writes():
+    """Commit des écritures bufferisées du catalogue."""
+    return get_store().flush()
+
+def failed_write_count():
+    """Total des lignes perdues par des commits en échec depuis le début du processus."""
+    return get_store().failed_rows
 
 def add_documents(metadata_list, vector_list):
-    """Insertion atomique avec normalisation L2 et Retry Sécurité (Windows/Rust)."""
+    """Insertion de documents (dicts) : transposés en colonnes puis écrits via add_columns."""
     if not metadata_list or not vector_list:
         return 0
-    
-    # Configuration du Retry
-    MAX_RETRIES = 5
-    BASE_DELAY = 0.2 
-    
-    table = init_tables()
-    rows = []
-
-    # --- ÉTAPE 1 : PRÉPARATION ET NORMALISATION ---
-    for meta, vec in zip(metadata_list, vector_list):
-        # Normalisation L2 (Essentiel pour la précision CLIP)
-        v = np.array(vec).astype('float32')
-        norm = np.linalg.norm(v)
-        v = v / norm if norm > 0 else v
-        
-        content_str = str(meta.get('content', ''))
-        
-        rows.append({
-            "vector": v.tolist(),
-            "source": str(meta.get('source', '')),
-            "file_hash": str(meta.get('file_hash', '')),
-            "type": str(meta.get('type', 'unknown')),
-            "domain": str(meta.get('domain', 'unknown')),
-            "label": str(meta.get('label', 'unknown')),
-            "domain_score": float(meta.get('domain_score', 0.0)),
-            "content": content_str[:20000], 
-            "snippet": str(meta.get('snippet') or content_str[:500]),
-            "visual_pure": meta.get('visual_pure', [0.0] * 512),
-            "image_linked": str(meta.get('image_linked') or ''), 
-            "extra": json.dumps(meta.get('extra', {}), ensure_ascii=False)
-        })
-
-    # --- ÉTAPE 2 : INSERTION AVEC RETRY (BOUCLE ANTI-COLLISION RUST) ---
+
+    # --- ÉTAPE 1 : TRANSPOSITION EN COLONNES ---
+    contents = [str(meta.get('content', '')) for meta in metadata_list]
+    columns = {
+        "source": [str(meta.get('source', '')) for meta in metadata_list],
+        "file_hash": [str(meta.get('file_hash', '')) for meta in metadata_list],
+        "type": [str(meta.get('type', 'unknown')) for meta in metadata_list],
+        "domain": [str(meta.get('domain', 'unknown')) for meta in metadata_list],
+        "label": [str(meta.get('label', 'unknown')) for meta in metadata_list],
+        "domain_score": [float(meta.get('domain_score', 0.0)) for meta in metadata_list],
+        "content": [c[:20000] for c in contents],
+        "snippet": [str(meta.get('snippet') or c[:500]) for meta, c in zip(metadata_list, contents)],
+        "visual_pure": [meta.get('visual_pure') for meta in metadata_list],
+        "image_linked": [str(meta.get('image_linked') or '') for meta in metadata_list],
+        "extra": [json.dumps(meta.get('extra', {}), ensure_ascii=False) for meta in metadata_list],
+    }
+
+    # --- ÉTAPE 2 : ÉCRITURE ARROW ---
+    return add_columns(columns, vector_list)
+
+def _fixed_size_list(matrix, dim):
+    """Matrice float32 (n, dim) -> FixedSizeListArray sans copie (vue sur le buffer NumPy)."""
+    flat = np.ascontiguousarray(matrix, dtype=np.float32).reshape(-1)
+    values = pa.Array.from_buffers(pa.float32(), len(flat), [None, pa.py_buffer(flat)])
+    return pa.FixedSizeListArray.from_arrays(values, dim)
+
+def _as_matrix(vectors, dim):
+    """Liste de vecteurs (ou matrice) -> matrice float32 (n, dim) ; None devient un vecteur nul."""
+    if isinstance(vectors, np.ndarray) and vectors.ndim == 2:
+        return np.ascontiguousarray(vectors, dtype=np.float32)
+    matrix = np.zeros((len(vectors), dim), dtype=np.float32)
+    for i, v in enumerate(vectors):
+        if v is not None:
+            matrix[i] = v
+    return matrix
+
+def add_columns(columns, vectors):
+    """
+    Écriture Arrow native : `vectors` est une matrice float32 (n, EMBEDDING_DIM)
+    (ou une liste de vecteurs), les métadonnées arrivent en colonnes.
+    Normalisation L2 en une opération sur tout le lot, colonnes vecteurs construites
+    en FixedSizeList directement sur le buffer NumPy : aucune liste Python par ligne.
+    """
+    if vectors is None or len(vectors) == 0:
+        return 0
+
+    # --- ÉTAPE 1 : NORMALISATION L2 VECTORISÉE (Essentiel pour la précision CLIP) ---
+    matrix = _as_matrix(vectors, config.EMBEDDING_DIM)
+    norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+    np.divide(matrix, norms, out=matrix, where=norms > 0)
+
+    # --- ÉTAPE 2 : RECORDBATCH ARROW ---
+    arrays = []
+    for field in CATALOG_SCHEMA:
+        if field.name == "vector":
+            arrays.append(_fixed_size_list(matrix, config.EMBEDDING_DIM))
+        elif field.name == "visual_pure":
+            arrays.append(_fixed_size_list(_as_matrix(columns["visual_pure"], field.type.list_size),
+                                           field.type.list_size))
+        else:
+            arrays.append(pa.array(columns[field.name], type=field.type))
+    batch = pa.RecordBatch.from_arrays(arrays, schema=CATALOG_SCHEMA)
+
+    # --- ÉTAPE 3 : TAMPON D'ÉCRITURE (commit groupé, avec retry anti-collision au flush) ---
+    return get_store().write(batch)
+
+def _add_with_retry(table, data, n_rows):
+    """table.add avec backoff exponentiel sur les verrous fichiers (Windows/Rust)."""
     for attempt in range(MAX_RETRIES):
         try:
-            table.add(rows)
-            return len(rows) 
+            table.add(data)
+            return n_rows 
             
         except Exception as e:
             error_msg = str(e).lower()
@@ -112,6 +247,7 @@ def add_documents(metadata_list, vector_list):
                 wait_time = BASE_DELAY * (2 ** attempt) + random.uniform(0, 0.1)
                 logger.warning(f"⚠️ Collision Windows détectée (Attempt {attempt+1}/{MAX_RETRIES}). Retry dans {wait_time:.2f}s...")
                 time.sleep(wait_time)
+                get_store().invalidate()
                 table = init_tables()
             else:
                 logger.error(f"Échec critique insertion LanceDB : {e}")
@@ -121,13 +257,15 @@ def add_documents(metadata_list, vector_list):
 
 # --- LOGIQUE DE MAINTENANCE (Portage SQLite) ---
 
+def _sql_str(value):
+    """Littéral SQL échappé pour les prédicats where()."""
+    return "'" + str(value).replace("'", "''") + "'"
+
 def check_file_status(file_hash, source_path):
-    """Détecte les nouveaux fichiers, doublons ou déplacements."""
-    db = get_db()
-    if config.TABLE_NAME not in db.table_names(): return 'new'
-    
-    table = db.open_table(config.TABLE_NAME)
-    res = table.search().where(f"file_hash = '{file_hash}'").to_pandas()
+    """Détecte les nouveaux fichiers, doublons ou déplacements (lookup ponctuel sur l'index BTREE)."""
+    table = init_tables()
+    res = (table.search().where(f"file_hash = {_sql_str(file_hash)}", prefilter=True)
+           .select(["source"]).limit(1).to_pandas())
     
     if res.empty: return 'new'
     return 'exists' if res.iloc[0]['source'] == str(source_path) else 'moved'
@@ -135,35 +273,50 @@ def check_file_status(file_hash, source_path):
 def update_file_source(file_hash, new_source):
     """Met à jour le chemin d'un fichier déplacé."""
     table = init_tables()
-    table.update(where=f"file_hash = '{file_hash}'", values={"source": str(new_source)})
+    table.update(where=f"file_hash = {_sql_str(file_hash)}", values={"source": str(new_source)})
+
+# --- CONTRATS DE DOSSIER (cache processus, write-through) ---
+_contract_cache = None
+
+def _get_contract_cache():
+    """Table folder_contracts chargée une seule fois (quelques lignes par archive)."""
+    global _contract_cache
+    if _contract_cache is None:
+        table = get_store().table("folder_contracts")
+        _contract_cache = {row["folder_path"]: row for row in table.to_arrow().to_pylist()}
+    return _contract_cache
 
 def get_folder_contract(folder_path):
-    """Récupère le contrat complet d'un dossier."""
-    db = get_db()
-    if "folder_contracts" not in list(db.table_names()): return None
-    table = db.open_table("folder_contracts")
-    res = table.search().where(f"folder_path = '{str(folder_path)}'", prefilter=True).to_pandas()
-    return res.iloc[0].to_dict() if not res.empty else None
+    """Récupère le contrat complet d'un dossier (aucune I/O après le premier appel)."""
+    return _get_contract_cache().get(str(folder_path))
 
 def save_folder_contract(folder_path, domain, signature,confidence=1.0, verified=0):
-    """Enregistre ou met à jour un contrat de dossier (Logique Upsert)."""
-    db = get_db()
-    table = db.open_table("folder_contracts")
-    table.delete(f"folder_path = '{str(folder_path)}'")
+    """Enregistre ou met à jour un contrat de dossier (Logique Upsert, cache mis à jour)."""
+    table = get_store().table("folder_contracts")
+    table.delete(f"folder_path = {_sql_str(folder_path)}")
     
-    table.add([{
+    contract = {
         "folder_path": str(folder_path),
         "signature": str(signature),
         "assigned_domain": domain,
         "confidence": float(confidence),
         "is_verified": int(verified)
-    }])
+    }
+    table.add([contract])
+    _get_contract_cache()[contract["folder_path"]] = contract
 
 def reset_store():
     """Réinitialisation totale (Base de données + Cache schémas)."""
+    global _contract_cache
     db = get_db()
+    get_store().discard()
     for t in db.table_names():
         db.drop_table(t)
+    get_store().invalidate()
+    _reset_hash_filter()
+    _contract_cache = None
+    if config.VECTOR_INDEX_STATE_PATH.exists():
+        config.VECTOR_INDEX_STATE_PATH.unlink()
     
     if config.SCHEMA_CACHE_PATH.exists():
         config.SCHEMA_CACHE_PATH.unlink()
@@ -172,38 +325,191 @@ def reset_store():
     init_tables()
     logger.info("Store LanceDB totalement réinitialisé (Page blanche).")
     
-def get_all_indexed_hashes():
-    """Récupère TOUTES les signatures (hashes) pour éviter de ré-ingérer l'existant."""
+# --- APPARTENANCE DES HASHES (DELTA-CHECK) ---
+_hash_filter = None
+
+def _rebuild_hash_filter(table, n_rows):
+    """Reconstruction complète en streaming (colonne file_hash lue par lots, RAM bornée)."""
+    logger.info(f"Fast-Check : reconstruction du filtre de hashes ({n_rows} lignes)...")
+    bloom = HashBloomFilter(max(config.HASH_FILTER_CAPACITY, 2 * n_rows), config.HASH_FILTER_ERROR_RATE)
+    if n_rows:
+        for batch in table.to_lance().to_batches(columns=["file_hash"]):
+            for h in batch.column(0).to_pylist():
+                if h: bloom.add(h)
+    bloom.version = n_rows
+    bloom.save(config.HASH_FILTER_PATH)
+    return bloom
+
+def get_hash_filter():
+    """
+    Filtre de Bloom persistant des file_hash du catalogue, tenu à jour par le store à chaque commit.
+    Estampillé par le nombre de lignes couvertes : un écart (autre processus, crash avant
+    sauvegarde) déclenche une reconstruction, jamais un faux négatif.
+    """
+    global _hash_filter
+    table = init_tables()
+    n_rows = table.count_rows()
+    if _hash_filter is None and config.HASH_FILTER_PATH.exists():
+        try:
+            _hash_filter = HashBloomFilter.load(config.HASH_FILTER_PATH, config.HASH_FILTER_ERROR_RATE)
+        except Exception as e:
+            logger.warning(f"Filtre de hashes illisible, reconstruction : {e}")
+    if _hash_filter is None or _hash_filter.version != n_rows or _hash_filter.saturated:
+        _hash_filter = _rebuild_hash_filter(table, n_rows)
+    return _hash_filter
+
+def _track_hashes(hashes, n_rows):
+    """Appelé après un commit du catalogue : ajoute les nouveaux hashes au filtre."""
+    global _hash_filter
     try:
-        db = get_db()
-        all_tables = list(db.table_names())
-        if config.TABLE_NAME not in all_tables: 
-            return set()
-        
-        table = db.open_table(config.TABLE_NAME)
-        
-        if table.count_rows() == 0:
-            return set()
-        query_builder = table.search() 
-        df = query_builder.select(["file_hash"]).to_pandas()
-        
-        if "file_hash" in df.columns:
-            hashes = df["file_hash"].dropna().unique().astype(str).tolist()
-            indexed_set = set(hashes)
-            logger.info(f"Fast-Check : {len(indexed_set)} signatures uniques trouvées en base.")
-            return indexed_set
-        
-        return set()
+        if _hash_filter is None:
+            if not config.HASH_FILTER_PATH.exists():
+                return  # Pas encore de filtre : il sera construit au prochain delta-check
+            _hash_filter = HashBloomFilter.load(config.HASH_FILTER_PATH, config.HASH_FILTER_ERROR_RATE)
+        if _hash_filter.version != n_rows - len(hashes):
+            _hash_filter = None
+            get_hash_filter()  # Filtre en retard sur la table : reconstruction (commit inclus)
+            return
+        for h in hashes:
+            if h: _hash_filter.add(h)
+        _hash_filter.version = n_rows
+    except Exception as e:
+        logger.warning(f"Mise à jour du filtre de hashes impossible : {e}")
+
+def _save_hash_filter():
+    if _hash_filter is not None and _hash_filter.dirty:
+        try:
+            _hash_filter.save(config.HASH_FILTER_PATH)
+        except Exception as e:
+            logger.error(f"Sauvegarde du filtre de hashes impossible : {e}")
+
+def _reset_hash_filter():
+    global _hash_filter
+    _hash_filter = None
+    if config.HASH_FILTER_PATH.exists():
+        config.HASH_FILTER_PATH.unlink()
 
+def find_indexed_hashes(hashes):
+    """
+    Sous-ensemble de `hashes` déjà présent en base : le filtre de Bloom écarte les nouveaux
+    sans I/O, les positifs sont confirmés par un lookup exact (index BTREE sur file_hash).
+    """
+    try:
+        bloom = get_hash_filter()
+        candidates = list({h for h in hashes if h and h in bloom})
+        if not candidates: return set()
+
+        dataset = init_tables().to_lance()
+        found = set()
+        for i in range(0, len(candidates), HASH_LOOKUP_CHUNK):
+            chunk = candidates[i:i + HASH_LOOKUP_CHUNK]
+            predicate = f"file_hash IN ({', '.join(_sql_str(h) for h in chunk)})"
+            found.update(dataset.to_table(columns=["file_hash"], filter=predicate).column(0).to_pylist())
+        return found
     except Exception as e:
-        logger.error(f"Erreur Fast-Check (récupération hashes) : {e}")
+        logger.error(f"Erreur Fast-Check (appartenance des hashes) : {e}")
         return set()
 
+def _index_params(n_rows, dim):
+    """IVF-PQ dimensionné sur la table : ~sqrt(n) partitions, sous-vecteurs de 8 (16 au-delà du million)."""
+    num_partitions = int(min(max(np.sqrt(n_rows), 16), config.INDEX_MAX_PARTITIONS))
+    sub_dim = 8 if n_rows < 1_000_000 else 16
+    while dim % sub_dim: sub_dim //= 2
+    return num_partitions, max(1, dim // sub_dim)
+
+def _existing_indices(table):
+    """{colonne vecteur: nom de l'index} pour les index déjà construits."""
+    found = {}
+    try:
+        for index in table.list_indices():
+            for column in getattr(index, "columns", []):
+                found[column] = index.name
+    except Exception as e:
+        logger.warning(f"Lecture des index impossible : {e}")
+    return found
+
+def _load_index_state():
+    """{colonne: {"trained_rows", "metric"}} enregistré à chaque entraînement d'index."""
+    try:
+        return json.loads(config.VECTOR_INDEX_STATE_PATH.read_text(encoding="utf-8"))
+    except FileNotFoundError:
+        return {}
+    except Exception as e:
+        logger.warning(f"État des index vectoriels illisible : {e}")
+        return {}
+
+def _save_index_state(state):
+    tmp = config.VECTOR_INDEX_STATE_PATH.with_suffix(".tmp")
+    tmp.write_text(json.dumps(state, indent=4), encoding="utf-8")
+    tmp.replace(config.VECTOR_INDEX_STATE_PATH)
+
 def create_vector_index():
-    """Crée un index IVF-PQ pour garantir des recherches sub-secondes sur disque."""
+    """
+    Index IVF-PQ sur les deux colonnes vecteurs (vector, visual_pure).
+    - Sous VECTOR_INDEX_MIN_ROWS lignes : pas d'index, la recherche reste un scan plat (exact et rapide).
+    - Index existant : les nouvelles lignes y sont ajoutées incrémentalement (optimize_indices).
+    - Reconstruction quand la table a été multipliée par INDEX_RETRAIN_FACTOR depuis l'entraînement
+      (partitions devenues trop grosses) ou quand la métrique a changé. Le nombre de lignes
+      d'entraînement est conservé à part : celui de l'index croît à chaque optimize_indices.
+    """
+    flush_writes()
     table = init_tables()
-    # On crée l'index uniquement s'il y a assez de données (ex: > 1000 docs)
-    if len(table) > 1000:
-        logger.info("Construction de l'index vectoriel sur disque...")
-        table.create_index(metric="cosine", num_partitions=256, num_sub_vectors=64)
-        logger.info(" Index vectoriel optimisé.")
\ No newline at end of file
+    n_rows = table.count_rows()
+    if n_rows < config.VECTOR_INDEX_MIN_ROWS:
+        logger.info(f"{n_rows} lignes : scan plat conservé (seuil d'indexation {config.VECTOR_INDEX_MIN_ROWS}).")
+        return
+
+    existing = _existing_indices(table)
+    state = _load_index_state()
+    to_update = []
+    for field in CATALOG_SCHEMA:
+        if not pa.types.is_fixed_size_list(field.type): continue
+        column, dim = field.name, field.type.list_size
+        metric = VECTOR_METRICS.get(column, "cosine")
+
+        trained = state.get(column, {})
+        if column in existing and trained.get("metric") == metric:
+            if n_rows < trained.get("trained_rows", n_rows) * config.INDEX_RETRAIN_FACTOR:
+                to_update.append(existing[column])
+                continue
+
+        num_partitions, num_sub_vectors = _index_params(n_rows, dim)
+        logger.info(f"Construction de l'index {column} ({metric}, {num_partitions} partitions, "
+                    f"{num_sub_vectors} sous-vecteurs)...")
+        table.create_index(metric=metric, vector_column_name=column, num_partitions=num_partitions,
+                           num_sub_vectors=num_sub_vectors, replace=True)
+        state[column] = {"trained_rows": n_rows, "metric": metric}
+        _save_index_state(state)
+
+    if to_update:
+        # Ajout des lignes non indexées aux partitions existantes (pas de ré-entraînement)
+        table.to_lance().optimize.optimize_indices(index_names=to_update)
+        logger.info(f" Index mis à jour incrémentalement : {', '.join(to_update)}")
+    logger.info(" Index vectoriels optimisés.")
+
+def create_scalar_indexes():
+    """
+    Index scalaires des colonnes filtrées (where) : BTREE pour les lookups ponctuels
+    à forte cardinalité, BITMAP pour les colonnes à peu de valeurs distinctes.
+    Seuls les index manquants sont créés ; les existants sont mis à jour par la maintenance.
+    Les index scalaires retirés de SCALAR_INDEXES (ex. BITMAP sur label) sont supprimés.
+    """
+    flush_writes()
+    for table_name, specs in SCALAR_INDEXES.items():
+        try:
+            table = get_store().table(table_name)
+            if table.count_rows() == 0: continue
+            existing = _existing_indices(table)
+            for column, index_name in existing.items():
+                if column in specs or column in VECTOR_METRICS or not hasattr(table, "drop_index"): continue
+                table.drop_index(index_name)
+                logger.info(f" Index obsolète supprimé : {table_name}.{column}")
+            for column, index_type in specs.items():
+                if column in existing: continue
+                table.create_scalar_index(column, index_type=index_type, replace=True)
+                logger.info(f" Index {index_type} créé sur {table_name}.{column}")
+        except Exception as e:
+            logger.warning(f"Index scalaires indisponibles sur {table_name} : {e}")
+
+def is_vector_indexed(table, column):
+    return column in _existing_indices(table)
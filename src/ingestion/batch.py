@@ -0,0 +1,206 @@
+# src/ingestion/batch.py
+import json
+import numpy as np
+import pyarrow as pa
+import pyarrow.compute as pc
+from src.ingestion.image_prep import read_segment
+
+# Schéma de transport worker -> parent (un lot = un RecordBatch Arrow)
+TRANSPORT_SCHEMA = pa.schema([
+    pa.field("source", pa.string()),
+    pa.field("file_hash", pa.string()),
+    pa.field("type", pa.string()),
+    pa.field("content", pa.large_string()),   # Texte brut (null pour un contenu dict)
+    pa.field("record", pa.large_string()),    # Contenu dict (ligne JSON, H5) en JSON
+    pa.field("cells", pa.map_(pa.string(), pa.string())),  # Ligne CSV/TSV : colonnes Arrow natives
+    pa.field("suggested_label", pa.string()),
+    pa.field("image_path", pa.string()),
+    pa.field("extra", pa.string()),           # JSON
+    pa.field("image_segment", pa.string()),   # Segment de mémoire partagée (cf. image_prep)
+    pa.field("image_slot", pa.int32()),
+    pa.field("image_count", pa.int32()),
+])
+
+def _cells_from_record_batch(record_batch):
+    """
+    RecordBatch (colonnes texte) -> MapArray colonne -> valeur, une entrée par ligne.
+    Réordonnancement ligne-majeur par un seul take sur les colonnes concaténées.
+    """
+    n, k = record_batch.num_rows, record_batch.num_columns
+    values = pa.concat_arrays([column.cast(pa.string()) for column in record_batch.columns])
+    order = (np.arange(n)[:, None] + np.arange(k)[None, :] * n).reshape(-1)
+    items = values.take(pa.array(order))
+    keys = pa.array(record_batch.schema.names, type=pa.string()).take(pa.array(np.tile(np.arange(k), n)))
+    offsets = pa.array(np.arange(0, n * k + 1, k, dtype=np.int32))
+    return pa.MapArray.from_arrays(offsets, keys, items)
+
+class DocumentRecord:
+    """
+    Vue ligne d'un DocumentBatch. Les __slots__ évitent un dict par document ;
+    get / [] / pop gardent l'interface des anciens dicts pour les étages du pipeline.
+    """
+    __slots__ = ("source", "file_hash", "type", "content", "suggested_label",
+                 "image_path", "extra", "image_array", "image")
+
+    def __init__(self, source, file_hash=None, type=None, content=None, suggested_label=None,
+                 image_path=None, extra=None, image_array=None):
+        self.source = source
+        self.file_hash = file_hash
+        self.type = type
+        self.content = content
+        self.suggested_label = suggested_label
+        self.image_path = image_path
+        self.extra = extra
+        self.image_array = image_array
+        self.image = None
+
+    def get(self, key, default=None):
+        value = getattr(self, key, None) if key in self.__slots__ else None
+        return default if value is None else value
+
+    def __getitem__(self, key):
+        if key not in self.__slots__: raise KeyError(key)
+        return getattr(self, key)
+
+    def __setitem__(self, key, value):
+        if key not in self.__slots__: raise KeyError(key)
+        setattr(self, key, value)
+
+    def __contains__(self, key):
+        return key in self.__slots__ and getattr(self, key) is not None
+
+    def pop(self, key, default=None):
+        value = self.get(key, default)
+        if key in self.__slots__: setattr(self, key, None)
+        return value
+
+class DocumentBatch:
+    """
+    Lot de documents orienté colonnes, adossé à une table Arrow.
+    Transféré du worker au parent en flux IPC Arrow (pas de pickle de dicts) ;
+    les pixels restent en mémoire partagée et sont rattachés côté parent dans `images`.
+    """
+    __slots__ = ("table", "images")
+
+    def __init__(self, table, images=None):
+        self.table = table
+        self.images = images if images is not None else [None] * table.num_rows
+
+    def __len__(self):
+        return self.table.num_rows
+
+    # --- CONSTRUCTION (WORKER) ---
+    @classmethod
+    def from_docs(cls, docs):
+        """Une passe par colonne sur les documents bruts des loaders."""
+        contents = [d.get("content") for d in docs]
+        shm = [d.get("image_shm") or (None, None, None) for d in docs]
+        columns = {
+            "source": [str(d.get("source", "")) for d in docs],
+            "file_hash": [d.get("file_hash") for d in docs],
+            "type": [d.get("type") for d in docs],
+            "content": [None if isinstance(c, dict) else (c if c is None or isinstance(c, str) else str(c))
+                        for c in contents],
+            "record": [json.dumps(c, ensure_ascii=False, default=str) if isinstance(c, dict) else None
+                       for c in contents],
+            "cells": [None] * len(docs),
+            "suggested_label": [None if d.get("suggested_label") is None else str(d.get("suggested_label"))
+                                for d in docs],
+            "image_path": [d.get("image_path") for d in docs],
+            "extra": [json.dumps(d["extra"], ensure_ascii=False, default=str) if d.get("extra") else None
+                      for d in docs],
+            "image_segment": [s[0] for s in shm],
+            "image_slot": [s[1] for s in shm],
+            "image_count": [s[2] for s in shm],
+        }
+        return cls(pa.Table.from_pydict(columns, schema=TRANSPORT_SCHEMA))
+
+    @classmethod
+    def from_tabular(cls, block, file_hashes):
+        """Lignes CSV/TSV (TabularBlock) : colonnes Arrow reprises telles quelles, sans dict par ligne."""
+        n = len(block)
+        columns = {field.name: pa.nulls(n, field.type) for field in TRANSPORT_SCHEMA}
+        columns["source"] = pa.array([str(block.source)] * n, type=pa.string())
+        columns["file_hash"] = pa.array(file_hashes, type=pa.string())
+        columns["type"] = pa.array([block.type] * n, type=pa.string())
+        columns["cells"] = _cells_from_record_batch(block.record_batch)
+        return cls(pa.Table.from_pydict(columns, schema=TRANSPORT_SCHEMA))
+
+    def set_file_hash(self, index, file_hash):
+        hashes = self.column("file_hash")
+        hashes[index] = file_hash
+        position = self.table.schema.get_field_index("file_hash")
+        self.table = self.table.set_column(position, TRANSPORT_SCHEMA.field("file_hash"),
+                                           pa.array(hashes, type=pa.string()))
+
+    def to_ipc(self):
+        sink = pa.BufferOutputStream()
+        with pa.ipc.new_stream(sink, self.table.schema) as writer:
+            writer.write_table(self.table)
+        return sink.getvalue()
+
+    # --- RÉCEPTION (PARENT) ---
+    @classmethod
+    def from_ipc(cls, payload):
+        with pa.ipc.open_stream(pa.py_buffer(payload)) as reader:
+            batch = cls(reader.read_all())
+        batch._attach_images()
+        return batch
+
+    def _attach_images(self):
+        """Rapatrie les images des segments partagés (un segment par lot worker), puis les libère."""
+        segments = self.table.column("image_segment").to_pylist()
+        if not any(segments): return
+        slots = self.table.column("image_slot").to_pylist()
+        counts = self.table.column("image_count").to_pylist()
+        blocks = {}
+        for i, name in enumerate(segments):
+            if name is None: continue
+            if name not in blocks:
+                blocks[name] = read_segment(name, counts[i])
+            if blocks[name] is not None:
+                self.images[i] = blocks[name][slots[i]]
+
+    # --- REGROUPEMENT ---
+    @classmethod
+    def concat(cls, batches):
+        if len(batches) == 1: return batches[0]
+        images = [img for b in batches for img in b.images]
+        return cls(pa.concat_tables([b.table for b in batches]), images)
+
+    def filter(self, mask):
+        """Sous-lot des lignes où `mask` (liste de booléens) est vrai."""
+        return DocumentBatch(self.table.filter(pa.array(mask, type=pa.bool_())),
+                             [img for img, keep in zip(self.images, mask) if keep])
+
+    def slice(self, offset, length=None):
+        stop = len(self) if length is None else offset + length
+        return DocumentBatch(self.table.slice(offset, stop - offset), self.images[offset:stop])
+
+    # --- ACCÈS ---
+    def column(self, name):
+        return self.table.column(name).to_pylist()
+
+    def has_cells(self):
+        """Masque des lignes CSV/TSV portées par la colonne `cells`."""
+        return pc.is_valid(self.table.column("cells")).to_pylist()
+
+    def records(self):
+        """
+        Vues ligne (__slots__), construites colonne par colonne.
+        Les lignes CSV/TSV n'y passent que sur la voie ligne à ligne (cells -> dict).
+        """
+        cols = {name: self.column(name) for name in
+                ("source", "file_hash", "type", "content", "record", "cells", "suggested_label", "image_path", "extra")}
+        return [
+            DocumentRecord(
+                source, file_hash, doc_type,
+                json.loads(record) if record is not None else (dict(cells) if cells is not None else content),
+                suggested_label, image_path,
+                json.loads(extra) if extra else {},
+                image_array
+            )
+            for source, file_hash, doc_type, content, record, cells, suggested_label, image_path, extra, image_array
+            in zip(cols["source"], cols["file_hash"], cols["type"], cols["content"], cols["record"], cols["cells"],
+                   cols["suggested_label"], cols["image_path"], cols["extra"], self.images)
+        ]
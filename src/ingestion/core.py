@@ -5,20 +5,38 @@ import gc
 import torch
 import time
 import psutil
+import json
+from concurrent.futures import ThreadPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
 from src import config
 from PIL import Image
-from src.embeddings.text_embeddings import embed_text_batch
-from src.embeddings.image_embeddings import embed_image_batch
+from src.embeddings.engine import embed_multimodal_batch
 from src.intelligence.domain_detector import detect_domain
 from src.intelligence.label_detector import detect_label
-from src.indexing.vector_store import add_documents, get_folder_contract, save_folder_contract
+from src.indexing.vector_store import add_columns, get_folder_contract, save_folder_contract
 from src.utils.logger import setup_logger
 from src.intelligence.llm_manager import get_llm
 from src.ingestion.dispatcher import is_visual_type
+from src.ingestion.image_prep import resize_for_clip
+from src.ingestion.batch import DocumentBatch
+from src.ingestion.tabular import (
+    is_tabular_doc, get_sealed_label_key, group_by_source, group_indices, build_tabular_texts,
+    extract_label_column, split_tabular_rows, is_list_line
+)
 
 _BATCH_COUNTER = 0
 logger = setup_logger("IngestionCore")
 _SESSION_IA_CACHE = {}
+# Voie tabulaire : décision de domaine mise en cache par fichier source
+_FILE_DOMAIN_CACHE = {}
+# Types dont le label proposé par le loader fait foi (dataset de labels frère / attributs HDF5).
+# Le TXT en mode liste propose la ligne elle-même : elle ne doit pas court-circuiter l'arbitrage
+SUGGESTED_LABEL_TYPES = {"h5"}
+# Pool de décodage image (PIL relâche le GIL pendant le décodage)
+_DECODE_POOL = None
+# Colonnes du catalogue (hors vecteur) : ordre des lignes préparées par _prepare_document_metadata
+CATALOG_COLUMNS = ["source", "file_hash", "type", "domain", "label", "domain_score",
+                   "content", "snippet", "visual_pure", "image_linked", "extra"]
 
 def _get_archive_entity(source_path):
     try:
@@ -30,81 +48,186 @@ def _get_archive_entity(source_path):
         pass
     return os.path.dirname(source_path)
 
-def process_batch(batch_docs, valid_labels):
-    global _BATCH_COUNTER
-    if not batch_docs: 
-        return 0, "unknown", 0.0
+def _get_decode_pool():
+    global _DECODE_POOL
+    if _DECODE_POOL is None:
+        _DECODE_POOL = ThreadPoolExecutor(max_workers=max(1, config.IMAGE_DECODE_THREADS),
+                                          thread_name_prefix="img_decode")
+    return _DECODE_POOL
 
-    _BATCH_COUNTER += 1
+def _decode_image(doc):
+    """Décode l'image d'un document directement à la taille d'entrée CLIP."""
+    # PRIORITÉ 0 : Tableau d'image déjà décodé par le worker (OCR, tenseurs H5), déjà au format CLIP
+    img_array = doc.pop('image_array', None)
+    if img_array is not None:
+        try:
+            return resize_for_clip(Image.fromarray(img_array).convert('RGB'))
+        except Exception as e:
+            logger.warning(f"Tableau image invalide dans {doc.get('source')}: {e}")
 
-    # --- ÉTAPE 1 : CHARGEMENT JIT MULTIMODAL (Modifié) ---
-    actual_images = []
-    for d in batch_docs:
-        img = None
-        # PRIORITÉ 1 : L'image liée via un fichier structuré (CSV/JSON/TXT)
-        img_target = d.get('image_path') 
-        
-        # PRIORITÉ 2 : Le fichier source lui-même (si c'est un format image)
-        if not img_target and is_visual_type(str(d.get('source', ''))):
-            img_target = d.get('source')
-        
-        if img_target:
-            try:
-                img = Image.open(img_target).convert('RGB')
-            except Exception as e:
-                logger.warning(f"Échec ouverture image {img_target}: {e}")
-                img = None
-        actual_images.append(img)
-        
-    # --- ÉTAPE 2 : VECTORISATION BATCH ---
-    texts = [str(d.get('content') or '') for d in batch_docs]
+    # PRIORITÉ 1 : L'image liée via un fichier structuré (CSV/JSON/TXT)
+    img_target = doc.get('image_path') 
     
+    # PRIORITÉ 2 : Le fichier source lui-même (si c'est un format image)
+    if not img_target and is_visual_type(str(doc.get('source', ''))):
+        img_target = doc.get('source')
+    
+    if not img_target:
+        return None
     try:
-        # Vectorisation Texte Batch 
-        text_vectors = embed_text_batch(texts)
-        
-        # Vectorisation Image Batch 
-        image_vectors = [None] * len(batch_docs)
-        valid_img_idx = [i for i, img in enumerate(actual_images) if img is not None]
-        
-        if valid_img_idx:
-            actual_vecs = embed_image_batch([actual_images[i] for i in valid_img_idx])
-            for i, idx in enumerate(valid_img_idx):
-                image_vectors[idx] = actual_vecs[i]
-                
+        with Image.open(img_target) as raw:
+            # JPEG : décodage DCT réduit (taille >= CLIP_INPUT_SIZE), sans effet sur les autres formats
+            raw.draft('RGB', (config.CLIP_INPUT_SIZE, config.CLIP_INPUT_SIZE))
+            img = raw.convert('RGB')
+        return resize_for_clip(img)
     except Exception as e:
-        logger.error(f"Erreur fatale lors de la vectorisation du batch : {e}")
-        for img in actual_images:
-            if img: img.close()
-        return 0, "unknown", 0.0
+        logger.warning(f"Échec ouverture image {img_target}: {e}")
+        return None
+
+def load_batch_images(batch_docs):
+    """ÉTAPE 1 : Chargement JIT multimodal des images liées ou sources (décodage parallèle)."""
+    if not any(d.get('image_array') is not None or d.get('image_path')
+               or is_visual_type(str(d.get('source', ''))) for d in batch_docs):
+        return [None] * len(batch_docs)
+    return list(_get_decode_pool().map(_decode_image, batch_docs))
+
+def release_batch_images(actual_images):
+    for img in actual_images:
+        if img: img.close()
+
+def build_batch_texts(batch_docs):
+    """Textes à vectoriser : colonne par colonne pour les lignes tabulaires, brut sinon."""
+    texts = [None] * len(batch_docs)
+    tabular_idx = [i for i, d in enumerate(batch_docs) if is_tabular_doc(d)]
+    for idxs in group_by_source(batch_docs, tabular_idx).values():
+        for i, text in zip(idxs, build_tabular_texts([batch_docs[i]['content'] for i in idxs])):
+            texts[i] = text
+    return [t if t is not None else str(d.get('content') or '') for t, d in zip(texts, batch_docs)]
+
+def _embedding_inputs(batch_docs, actual_images, tabular=None):
+    # Lignes CSV/TSV en colonnes : textes déjà calculés en Arrow, à la suite des vues ligne
+    texts = build_batch_texts(batch_docs) + (tabular.texts if tabular else [])
+    # Textes identiques vectorisés une seule fois
+    unique_texts = list(dict.fromkeys(texts))
+    valid_img_idx = [i for i, img in enumerate(actual_images) if img is not None]
+    return texts, unique_texts, valid_img_idx, [actual_images[i] for i in valid_img_idx]
+
+def _assemble_vectors(texts, unique_texts, unique_vecs, valid_img_idx, actual_vecs, n_docs):
+    unique_vectors = dict(zip(unique_texts, unique_vecs))
+    text_vectors = [unique_vectors[t] for t in texts]
+    
+    image_vectors = [None] * n_docs
+    for i, idx in enumerate(valid_img_idx):
+        image_vectors[idx] = actual_vecs[i]
+    return text_vectors, image_vectors
+
+def vectorize_batch(batch_docs, actual_images, tabular=None):
+    """
+    ÉTAPE 2 : Vectorisation batch (Texte + Image, un seul modèle CLIP). Lève l'exception en cas d'échec.
+    Vecteurs des vues ligne puis des lignes `tabular` (sans image), dans cet ordre.
+    """
+    texts, unique_texts, valid_img_idx, images = _embedding_inputs(batch_docs, actual_images, tabular)
+    unique_vecs, actual_vecs = embed_multimodal_batch(unique_texts, images)
+    return _assemble_vectors(texts, unique_texts, unique_vecs, valid_img_idx, actual_vecs, len(texts))
+
+def submit_vectorize_batch(batch_docs, actual_images, embed_pool, tabular=None):
+    """
+    ÉTAPE 2 (pool d'inférence) : soumet le batch sans attendre et renvoie `collect()`,
+    qui bloque jusqu'au résultat (text_vectors, image_vectors) et relève l'exception éventuelle.
+    """
+    texts, unique_texts, valid_img_idx, images = _embedding_inputs(batch_docs, actual_images, tabular)
+    try:
+        future = embed_pool.submit(unique_texts, images)
+    except BrokenProcessPool:
+        # Pool désactivé après des pertes de processus répétées : vectorisation locale
+        vectors = vectorize_batch(batch_docs, actual_images, tabular)
+        return lambda: vectors
 
-    # --- ÉTAPE 3 : CERVEAU & PRÉPARATION MÉTADONNÉES ---
-    metadata_buffer = []
-    vector_buffer = []
+    def collect():
+        try:
+            unique_vecs, actual_vecs = future.result()
+        except BrokenProcessPool:
+            # Processus d'inférence mort (OOM, crash) : une seule nouvelle tentative
+            unique_vecs, actual_vecs = embed_pool.retry(unique_texts, images)
+        return _assemble_vectors(texts, unique_texts, unique_vecs, valid_img_idx, actual_vecs, len(texts))
+    return collect
+
+def _fuse_vectors(text_vec, img_vec):
+    vecs = [v for v in [text_vec, img_vec] if v is not None]
+    return np.mean(vecs, axis=0) if vecs else np.zeros(config.EMBEDDING_DIM)
+
+def prepare_batch_metadata(batch_docs, actual_images, text_vectors, image_vectors, valid_labels, tabular=None):
+    """
+    ÉTAPE 3 : Cerveau (Domaine, Label) & préparation des métadonnées, directement en colonnes.
+    Les lignes tabulaires dont le fichier a un plan scellé passent par la voie colonne rapide
+    (`tabular` : lignes CSV/TSV restées en Arrow, vecteurs à la suite de ceux de batch_docs).
+    """
+    columns = {name: [] for name in CATALOG_COLUMNS}
+    vectors = []
     last_domain = "unknown"
     last_score = 0.0
+
+    if tabular:
+        try:
+            (tab_columns, tab_vectors), domain, score = _prepare_cell_columns(
+                tabular, text_vectors[len(batch_docs):]
+            )
+            for name in CATALOG_COLUMNS:
+                columns[name] += tab_columns[name]
+            vectors += tab_vectors
+            if domain != "unknown":
+                last_domain, last_score = domain, score
+        except Exception as e:
+            logger.warning(f"Lignes tabulaires ignorées : {e}")
+
+    fast_idx = [i for i, d in enumerate(batch_docs)
+                if is_tabular_doc(d) and get_sealed_label_key(d['source'], valid_labels, d['content'])]
+    if fast_idx:
+        try:
+            (tab_columns, tab_vectors), domain, score = _prepare_tabular_columns(
+                batch_docs, fast_idx, text_vectors, image_vectors, valid_labels
+            )
+            for name in CATALOG_COLUMNS:
+                columns[name] += tab_columns[name]
+            vectors += tab_vectors
+            if domain != "unknown":
+                last_domain, last_score = domain, score
+        except Exception as e:
+            logger.warning(f"Voie tabulaire indisponible, repli ligne à ligne : {e}")
+            fast_idx = []
+
+    # Lignes TXT en mode liste : même voie colonne, domaine et label structurel par fichier
+    list_idx = [i for i, d in enumerate(batch_docs) if is_list_line(d)]
+    if list_idx:
+        try:
+            (list_columns, list_vectors), domain, score = _prepare_list_columns(
+                batch_docs, list_idx, text_vectors, image_vectors, valid_labels
+            )
+            for name in CATALOG_COLUMNS:
+                columns[name] += list_columns[name]
+            vectors += list_vectors
+            if domain != "unknown":
+                last_domain, last_score = domain, score
+        except Exception as e:
+            logger.warning(f"Voie liste TXT indisponible, repli ligne à ligne : {e}")
+            list_idx = []
+    fast_set = set(fast_idx) | set(list_idx)
     
     for i, doc in enumerate(batch_docs):
+        if i in fast_set: continue
         try:
-            vecs = [v for v in [text_vectors[i], image_vectors[i]] if v is not None]
-            final_vector = np.mean(vecs, axis=0) if vecs else np.zeros(config.EMBEDDING_DIM)
-            img_vec = image_vectors[i]
-            if img_vec is not None and hasattr(img_vec, "tolist"):
-                pure_visual = img_vec.tolist()
-            else:
-                pure_visual = [0.0] * 512
+            final_vector = _fuse_vectors(text_vectors[i], image_vectors[i])
             doc['image'] = actual_images[i] 
             
             # Analyse IA (Domaine, Label, Score) - Récupération du triplet
-            meta, domain, score = _prepare_document_metadata(doc, final_vector, image_vectors[i], valid_labels)
-            meta['visual_pure'] = pure_visual
+            row, domain, score = _prepare_document_metadata(doc, final_vector, image_vectors[i], valid_labels)
+            for name, value in zip(CATALOG_COLUMNS, row):
+                columns[name].append(value)
+            vectors.append(final_vector)
             
             if domain != "unknown":
                 last_domain = domain
                 last_score = score
-
-            metadata_buffer.append(meta)
-            vector_buffer.append(final_vector)
             
             # --- NETTOYAGE PHYSIQUE IMMÉDIAT ---
             if actual_images[i]:
@@ -114,41 +237,59 @@ def process_batch(batch_docs, valid_labels):
         except Exception as e:
             logger.warning(f"Fichier ignoré : {doc.get('source')} | {e}")
             continue
+
+    release_batch_images([actual_images[i] for i in fast_set])
+    return columns, vectors, last_domain, last_score
+
+def write_batch(columns, vectors):
+    """ÉTAPE 4 : Insertion LanceDB (un RecordBatch Arrow par batch) + nettoyage périodique (MODULO)."""
+    global _BATCH_COUNTER
+    _BATCH_COUNTER += 1
+
+    indexed_count = add_columns(columns, vectors) if vectors else 0
         
-    # --- ÉTAPE 4 : INSERTION ---
-    indexed_count = 0
-    if metadata_buffer:
-        indexed_count = add_documents(metadata_buffer, vector_buffer)
-        
-    # --- ÉTAPE 5 : NETTOYAGE  (MODULO) ---
     if _BATCH_COUNTER % config.CLEANUP_MODULO == 0:
         gc.collect()
         if config.DEVICE == "cuda":
             torch.cuda.empty_cache()
+    return indexed_count
+
+def process_batch(batch_docs, valid_labels):
+    """Exécution séquentielle des 4 étapes (utilisée hors pipeline)."""
+    if not batch_docs: 
+        return 0, "unknown", 0.0
+    tabular = None
+    if isinstance(batch_docs, DocumentBatch):
+        tabular, batch_docs = split_tabular_rows(batch_docs, valid_labels)
+
+    actual_images = load_batch_images(batch_docs)
+    try:
+        text_vectors, image_vectors = vectorize_batch(batch_docs, actual_images, tabular)
+    except Exception as e:
+        logger.error(f"Erreur fatale lors de la vectorisation du batch : {e}")
+        release_batch_images(actual_images)
+        return 0, "unknown", 0.0
+
+    columns, vectors, last_domain, last_score = prepare_batch_metadata(
+        batch_docs, actual_images, text_vectors, image_vectors, valid_labels, tabular
+    )
+    indexed_count = write_batch(columns, vectors)
 
     # Purge finale des listes temporaires
-    batch_docs.clear()
     actual_images.clear()
-    metadata_buffer.clear()
-    vector_buffer.clear()
+    vectors.clear()
 
     return indexed_count, last_domain, last_score
 
-def _prepare_document_metadata(doc, vector, img_vector, valid_labels):
-    if doc.get("extra") is None:
-        doc["extra"] = {}
-    
-    source_path = doc["source"]
-    raw_content = doc.get("content") 
-    content_str = str(raw_content or "")
-    
+def _resolve_domain(source_path, raw_content, content_str, vector):
+    """Domaine (Contrat / Session / IA + arbitrage LLM). Renvoie (domain, score, actual_score, method, extra)."""
+    extra = {}
     archive_path = _get_archive_entity(source_path)
     contract = get_folder_contract(archive_path)
     
     c_domain = contract.get("assigned_domain") if contract else None
     c_score = contract.get("confidence") if contract else 0.0
     
-    # 1. Détection du Domaine (IA / Contrat / Session)
     if c_domain and c_domain != "unknown":
         domain, actual_score, method = c_domain, c_score, "contract_trust"
         score = 1.0 
@@ -174,11 +315,157 @@ def _prepare_document_metadata(doc, vector, img_vector, valid_labels):
             domain = res.get("final_domain", domain)
             actual_score = float(res.get("confidence", actual_score))
             method = "llm_arbitration"
-            doc["extra"]["llm_justification"] = res.get("justification")
+            extra["llm_justification"] = res.get("justification")
             
             _SESSION_IA_CACHE[archive_path] = {"domain": domain, "score": actual_score}
         
         score = actual_score
+    return domain, score, actual_score, method, extra
+
+def _file_domain(source_path, record, vector):
+    """Voie tabulaire : une seule décision de domaine par fichier (mise en cache)."""
+    if source_path not in _FILE_DOMAIN_CACHE:
+        _FILE_DOMAIN_CACHE[source_path] = _resolve_domain(source_path, record, str(record), vector)
+    return _FILE_DOMAIN_CACHE[source_path]
+
+def _extend_file_rows(columns, source_path, decision, file_hashes, types, labels, contents,
+                      visual, linked, ingested_at, ram_usage):
+    """Ajoute les lignes d'un fichier aux colonnes du catalogue (métadonnées communes au fichier)."""
+    domain, score, actual_score, method, extra = decision
+    n = len(file_hashes)
+    extra_json = json.dumps({**extra, "detection_method": method, "ingested_at": ingested_at,
+                             "ram_usage": ram_usage}, ensure_ascii=False)
+    columns["source"] += [str(source_path)] * n
+    columns["file_hash"] += file_hashes
+    columns["type"] += types
+    columns["domain"] += [str(domain)] * n
+    columns["label"] += labels
+    columns["domain_score"] += [round(float(score), 4)] * n
+    columns["content"] += [c[:20000] for c in contents]
+    columns["snippet"] += [c[:500] for c in contents]
+    columns["visual_pure"] += visual
+    columns["image_linked"] += linked
+    columns["extra"] += [extra_json] * n
+
+def _prepare_tabular_columns(batch_docs, indices, text_vectors, image_vectors, valid_labels):
+    """
+    Voie rapide colonne : domaine décidé une fois par fichier, labels extraits de la
+    colonne scellée, métadonnées assemblées en colonnes pour un RecordBatch Arrow.
+    """
+    columns = {name: [] for name in CATALOG_COLUMNS}
+    vectors = []
+    last_domain, last_score = "unknown", 0.0
+    ingested_at = time.time()
+    ram_usage = f"{psutil.virtual_memory().percent}%"
+
+    for source_path, idxs in group_by_source(batch_docs, indices).items():
+        records = [batch_docs[i]['content'] for i in idxs]
+        fused = [_fuse_vectors(text_vectors[i], image_vectors[i]) for i in idxs]
+
+        decision = _file_domain(source_path, records[0], fused[0])
+        if decision[0] != "unknown":
+            last_domain, last_score = decision[0], decision[2]
+
+        _extend_file_rows(
+            columns, source_path, decision,
+            [str(batch_docs[i].get("file_hash", '')) for i in idxs],
+            [str(batch_docs[i].get("type", "unknown")) for i in idxs],
+            # Labels : extraction directe de la colonne scellée
+            extract_label_column(records, get_sealed_label_key(source_path, valid_labels)),
+            [str(r) for r in records],
+            [image_vectors[i] for i in idxs],
+            [str(batch_docs[i].get("image_path") or '') for i in idxs],
+            ingested_at, ram_usage
+        )
+        vectors += fused
+
+    return (columns, vectors), last_domain, last_score
+
+def _prepare_cell_columns(tabular, text_vectors):
+    """
+    Voie rapide des lignes CSV/TSV restées en Arrow : labels et textes déjà extraits
+    colonne par colonne ; le texte d'embedding sert de contenu (pas d'image).
+    """
+    columns = {name: [] for name in CATALOG_COLUMNS}
+    vectors = []
+    last_domain, last_score = "unknown", 0.0
+    ingested_at = time.time()
+    ram_usage = f"{psutil.virtual_memory().percent}%"
+
+    sources = tabular.column("source")
+    file_hashes = tabular.column("file_hash")
+    types = tabular.column("type")
+    for source_path, idxs in group_indices(sources).items():
+        decision = _file_domain(source_path, tabular.record(idxs[0]), text_vectors[idxs[0]])
+        if decision[0] != "unknown":
+            last_domain, last_score = decision[0], decision[2]
+
+        _extend_file_rows(
+            columns, source_path, decision,
+            [file_hashes[i] or '' for i in idxs],
+            [types[i] or "unknown" for i in idxs],
+            [tabular.labels[i] for i in idxs],
+            [tabular.texts[i] for i in idxs],
+            [None] * len(idxs), [''] * len(idxs),
+            ingested_at, ram_usage
+        )
+        vectors += [text_vectors[i] for i in idxs]
+
+    return (columns, vectors), last_domain, last_score
+
+def _prepare_list_columns(batch_docs, indices, text_vectors, image_vectors, valid_labels):
+    """
+    Voie colonne des lignes TXT en mode liste : domaine décidé une fois par fichier.
+    Le label structurel (dossier vs fichier) vaut pour tout le fichier ; sans lui,
+    chaque ligne garde l'arbitrage complet (mots-clés, repli statistique, LLM).
+    """
+    columns = {name: [] for name in CATALOG_COLUMNS}
+    vectors = []
+    last_domain, last_score = "unknown", 0.0
+    ingested_at = time.time()
+    ram_usage = f"{psutil.virtual_memory().percent}%"
+
+    for source_path, idxs in group_by_source(batch_docs, indices).items():
+        lines = [str(batch_docs[i].get('content') or '') for i in idxs]
+        fused = [_fuse_vectors(text_vectors[i], image_vectors[i]) for i in idxs]
+
+        decision = _file_domain(source_path, lines[0], fused[0])
+        if decision[0] != "unknown":
+            last_domain, last_score = decision[0], decision[2]
+
+        # Sans contenu, detect_label s'arrête à la structure du chemin (ou renvoie "unknown")
+        file_label = detect_label(filepath=source_path, content=None, label_mapping=valid_labels, type="txt")
+        if file_label != "unknown":
+            labels = [str(file_label)] * len(idxs)
+        else:
+            labels = [str(detect_label(filepath=source_path, content=line, image_vector=image_vectors[i],
+                                       label_mapping=valid_labels, type="txt"))
+                      for i, line in zip(idxs, lines)]
+
+        _extend_file_rows(
+            columns, source_path, decision,
+            [str(batch_docs[i].get("file_hash", '')) for i in idxs],
+            ["txt"] * len(idxs),
+            labels, lines,
+            [image_vectors[i] for i in idxs],
+            [str(batch_docs[i].get("image_path") or '') for i in idxs],
+            ingested_at, ram_usage
+        )
+        vectors += fused
+
+    return (columns, vectors), last_domain, last_score
+
+def _prepare_document_metadata(doc, vector, img_vector, valid_labels):
+    if doc.get("extra") is None:
+        doc["extra"] = {}
+    
+    source_path = doc["source"]
+    raw_content = doc.get("content") 
+    content_str = str(raw_content or "")
+    
+    # 1. Détection du Domaine (IA / Contrat / Session)
+    domain, score, actual_score, method, extra = _resolve_domain(source_path, raw_content, content_str, vector)
+    doc["extra"].update(extra)
 
     # 2. Résolution du Label (Niveau 3)
     label = detect_label(
@@ -187,25 +474,28 @@ def _prepare_document_metadata(doc, vector, img_vector, valid_labels):
         image=doc.get('image'), 
         image_vector=img_vector, 
         label_mapping=valid_labels,
+        suggested_label=doc.get('suggested_label') if doc.get('type') in SUGGESTED_LABEL_TYPES else None,
         type=doc.get('type')
     )
 
-    # 3. Assemblage Final des Métadonnées
-    metadata = {
-        "source": source_path,
-        "file_hash": doc.get("file_hash"),
-        "type": doc.get("type", "unknown"),
-        "domain": str(domain),
-        "label": label,
-        "domain_score": round(float(score), 4),
-        "content": content_str[:20000], 
-        "snippet": content_str[:500],
-        "image_linked": doc.get("image_path"), 
-        "extra": {
-            **doc["extra"], 
-            "detection_method": method,
-            "ingested_at": time.time(),
-            "ram_usage": f"{psutil.virtual_memory().percent}%"
-        }
-    }
-    return metadata, domain, actual_score
\ No newline at end of file
+    # 3. Assemblage Final : une ligne dans l'ordre de CATALOG_COLUMNS (pas de dict intermédiaire)
+    extra_json = json.dumps({
+        **doc["extra"], 
+        "detection_method": method,
+        "ingested_at": time.time(),
+        "ram_usage": f"{psutil.virtual_memory().percent}%"
+    }, ensure_ascii=False)
+    row = (
+        str(source_path),
+        str(doc.get("file_hash", '')),
+        str(doc.get("type", "unknown")),
+        str(domain),
+        str(label),
+        round(float(score), 4),
+        content_str[:20000], 
+        content_str[:500],
+        img_vector,  # NumPy brut : add_columns en fait une colonne FixedSizeList
+        str(doc.get("image_path") or ''), 
+        extra_json
+    )
+    return row, domain, actual_score
@@ -14,7 +14,7 @@ LOADER_MAPPING = {
     '.tsv': TSVLoader,    
     '.pdf': PDFLoader,
     '.h5': H5Loader,
-    '.json': JSONLoader,
+    '.json': JSONLoader, '.jsonl': JSONLoader, '.ndjson': JSONLoader,
     '.txt': TXTLoader,
     '.jpg': ImageLoader, '.jpeg': ImageLoader, '.png': ImageLoader, '.webp': ImageLoader
 }
@@ -33,7 +33,7 @@ LOADER_CACHE = {}
 def get_supported_extensions():
     return list(LOADER_MAPPING.keys())
 
-def dispatch_loader(path: str, valid_labels=None):
+def _get_loader(path: str):
     ext = os.path.splitext(path)[1].lower()
     loader_class = LOADER_MAPPING.get(ext)
     
@@ -42,5 +42,11 @@ def dispatch_loader(path: str, valid_labels=None):
 
     if loader_class not in LOADER_CACHE:
         LOADER_CACHE[loader_class] = loader_class()
-    
-    return LOADER_CACHE[loader_class].load(path, valid_labels=valid_labels)
\ No newline at end of file
+    return LOADER_CACHE[loader_class]
+
+def dispatch_loader(path: str, valid_labels=None):
+    return _get_loader(path).load(path, valid_labels=valid_labels)
+
+def dispatch_batches(path: str, valid_labels=None, batch_size: int = 64, **options):
+    """Version streaming : génère des lots de documents de taille bornée (options propres au loader)."""
+    return _get_loader(path).iter_batches(path, valid_labels=valid_labels, batch_size=batch_size, **options)
\ No newline at end of file
@@ -0,0 +1,80 @@
+# src/ingestion/image_prep.py
+import numpy as np
+from multiprocessing import shared_memory
+from PIL import Image
+from src import config
+from src.utils.logger import setup_logger
+
+logger = setup_logger("ImagePrep")
+
+def resize_for_clip(img):
+    """Réduit le plus petit côté à CLIP_INPUT_SIZE (CLIPProcessor ne fait plus que le crop central)."""
+    size = config.CLIP_INPUT_SIZE
+    scale = size / max(1, min(img.size))
+    if scale >= 1.0:
+        return img
+    resized = img.resize((max(size, round(img.width * scale)), max(size, round(img.height * scale))),
+                         Image.BICUBIC)
+    img.close()
+    return resized
+
+def clip_ready_array(image):
+    """
+    Image (PIL ou tableau) -> uint8 CLIP_INPUT_SIZE x CLIP_INPUT_SIZE x 3,
+    redimensionnée puis recadrée au centre comme le fait CLIPProcessor.
+    """
+    size = config.CLIP_INPUT_SIZE
+    img = Image.fromarray(image) if isinstance(image, np.ndarray) else image
+    img = resize_for_clip(img.convert('RGB'))
+    if img.width < size or img.height < size:
+        img = img.resize((max(size, img.width), max(size, img.height)), Image.BICUBIC)
+    left, top = (img.width - size) // 2, (img.height - size) // 2
+    return np.asarray(img.crop((left, top, left + size, top + size)), dtype=np.uint8)
+
+def _frame_shape():
+    return (config.CLIP_INPUT_SIZE, config.CLIP_INPUT_SIZE, 3)
+
+# --- TRANSFERT WORKER -> PARENT ---
+def pack_batch_images(batch):
+    """
+    Côté worker : les tableaux image d'un lot sont réduits au format CLIP et copiés
+    dans UN segment de mémoire partagée. Les documents ne transportent plus que
+    (nom du segment, position, nombre d'images) : aucun pixel dans le flux Arrow.
+    """
+    frames, owners = [], []
+    for doc in batch:
+        array = doc.pop('image_array', None)
+        if array is None: continue
+        try:
+            frames.append(clip_ready_array(array))
+            owners.append(doc)
+        except Exception as e:
+            logger.warning(f"Image ignorée dans {doc.get('source')}: {e}")
+    if not frames: return
+
+    shm = shared_memory.SharedMemory(create=True, size=len(frames) * int(np.prod(_frame_shape())))
+    try:
+        block = np.ndarray((len(frames), *_frame_shape()), dtype=np.uint8, buffer=shm.buf)
+        block[:] = np.stack(frames)
+        del block
+        for slot, doc in enumerate(owners):
+            doc['image_shm'] = (shm.name, slot, len(frames))
+    finally:
+        # Le segment survit à la fermeture : c'est le parent qui le détruit (unlink)
+        shm.close()
+
+def read_segment(name, count):
+    """Côté parent : rapatrie les images d'un segment partagé puis le détruit."""
+    try:
+        shm = shared_memory.SharedMemory(name=name)
+    except FileNotFoundError:
+        logger.warning(f"Segment image introuvable : {name}")
+        return None
+    try:
+        view = np.ndarray((count, *_frame_shape()), dtype=np.uint8, buffer=shm.buf)
+        block = view.copy()
+        del view
+        return block
+    finally:
+        shm.close()
+        shm.unlink()
@@ -15,4 +15,10 @@ class BaseLoader(ABC):
     @abstractmethod
     def load(self, path: str, valid_labels=None) -> list:
         """Logique d'extraction des données."""
-        pass
\ No newline at end of file
+        pass
+
+    def iter_batches(self, path: str, valid_labels=None, batch_size: int = 64, **options):
+        """Flux de documents par lots bornés (par défaut : découpe du résultat de load)."""
+        docs = self.load(path, valid_labels=valid_labels) or []
+        for i in range(0, len(docs), batch_size):
+            yield docs[i:i + batch_size]
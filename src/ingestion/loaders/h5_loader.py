@@ -1,6 +1,68 @@
 # src/ingestion/loaders/h5_loader.py
 import h5py
+import numpy as np
+from src import config
 from src.ingestion.loaders.base_loader import BaseLoader
+from src.utils.logger import setup_logger
+
+logger = setup_logger("H5Loader")
+
+# Budget de lecture par tranche quand le dataset n'est pas chunké
+READ_BUDGET_BYTES = 4 * 1024 * 1024
+# Noms de datasets frères portant un label par ligne
+LABEL_DATASET_NAMES = ("label", "labels", "y", "class", "classes", "category", "categories")
+
+def _decode(value):
+    if isinstance(value, bytes):
+        return value.decode("utf-8", errors="ignore")
+    if isinstance(value, np.generic):
+        return value.item()
+    return value
+
+def _is_image_tensor(node):
+    """(N, H, W), (N, H, W, C) ou (N, C, H, W) avec C in {1, 3} : une image par ligne."""
+    if node.dtype.kind not in "uif" or node.ndim not in (3, 4):
+        return False
+    if node.ndim == 3:
+        return min(node.shape[1:]) >= 16
+    return (node.shape[-1] in (1, 3) and min(node.shape[1:3]) >= 16) or \
+           (node.shape[1] in (1, 3) and min(node.shape[2:]) >= 16)
+
+def _to_rgb_array(frame):
+    """Normalise une image brute du tenseur en uint8 HxWx3."""
+    if frame.ndim == 3 and frame.shape[0] in (1, 3) and frame.shape[-1] not in (1, 3):
+        frame = np.transpose(frame, (1, 2, 0))
+    if frame.ndim == 3 and frame.shape[-1] == 1:
+        frame = frame[..., 0]
+    if frame.dtype != np.uint8:
+        frame = frame.astype(np.float32)
+        if frame.max() <= 1.0:
+            frame = frame * 255.0
+        frame = np.clip(frame, 0, 255).astype(np.uint8)
+    if frame.ndim == 2:
+        frame = np.stack([frame] * 3, axis=-1)
+    return np.ascontiguousarray(frame)
+
+def _slice_rows(node):
+    """Nombre de lignes lues par tranche : aligné sur le chunking natif de h5py."""
+    if node.chunks:
+        return max(1, node.chunks[0])
+    row_bytes = max(1, int(np.prod(node.shape[1:], dtype=np.int64)) * node.dtype.itemsize)
+    return max(1, READ_BUDGET_BYTES // row_bytes)
+
+def _uses_label_dataset(node):
+    """Tenseur d'images, matrice ou table : un label par ligne peut venir d'un dataset frère."""
+    return node.ndim > 0 and (_is_image_tensor(node) or node.ndim > 1 or bool(node.dtype.names))
+
+def _find_label_dataset(node):
+    parent = node.parent
+    for key in parent.keys():
+        candidate = parent[key]
+        if isinstance(candidate, h5py.Dataset) and candidate.name != node.name \
+                and key.lower() in LABEL_DATASET_NAMES \
+                and candidate.ndim == 1 and candidate.shape[0] == node.shape[0]:
+            return candidate
+    return None
 
 class H5Loader(BaseLoader):
     def get_supported_extensions(self):
@@ -9,30 +71,82 @@ class H5Loader(BaseLoader):
     def can_handle(self, extension: str) -> bool:
         return extension.lower() in self.get_supported_extensions()
 
-    def load(self, path: str, valid_labels=None) -> list:
-        docs = []
+    def iter_batches(self, path: str, valid_labels=None, batch_size: int = 64, **options):
+        """
+        Lecture paresseuse par tranches (chunks h5py) : jamais de dataset chargé en entier.
+        - Tenseur d'images : un document par image (tableau RGB transmis au vectoriseur image).
+        - Table (compound) / matrice : un document par ligne.
+        - Vecteur 1-D : un document par fenêtre de H5_WINDOW_SIZE valeurs
+          (sauf s'il sert de colonne de labels à un dataset frère).
+        """
+        batch = []
         try:
             with h5py.File(path, "r") as f:
-                def visit(name, node):
-                    if isinstance(node, h5py.Dataset):
-                        if node.size * node.dtype.itemsize > 10 * 1024 * 1024:
-                            content_summary = f"Large Dataset: shape={node.shape}, dtype={node.dtype}"
-                        else:
-                            try:
-                                content_summary = str(node[()])
-                            except:
-                                content_summary = "Non-text binary data"
-                        
-                        attrs = {k: str(v) for k, v in node.attrs.items()}
-                        suggested = attrs.get("label") or attrs.get("category") or attrs.get("class")
-                        
-                        docs.append({
-                            "source": path,
-                            "type": "h5",
-                            "content": {name: content_summary},
-                            "suggested_label": suggested 
-                        })
-                f.visititems(visit)
-        except Exception:
-            pass 
-        return docs
\ No newline at end of file
+                names = []
+                f.visititems(lambda name, node: names.append(name) if isinstance(node, h5py.Dataset) else None)
+
+                # Datasets consommés comme colonne de labels : pas de documents propres
+                consumed = set()
+                for name in names:
+                    label_node = _find_label_dataset(f[name]) if _uses_label_dataset(f[name]) else None
+                    if label_node is not None:
+                        consumed.add(label_node.name)
+
+                for name in names:
+                    if f[name].name in consumed: continue
+                    for doc in self._iter_dataset_docs(path, name, f[name]):
+                        batch.append(doc)
+                        if len(batch) >= batch_size:
+                            yield batch
+                            batch = []
+        except Exception as e:
+            logger.error(f"Lecture interrompue ({path}) : {e}")
+        if batch:
+            yield batch
+
+    def _iter_dataset_docs(self, path, name, node):
+        attrs = {k: str(v) for k, v in node.attrs.items()}
+        suggested = attrs.get("label") or attrs.get("category") or attrs.get("class")
+
+        # Scalaire : un seul document
+        if node.ndim == 0:
+            yield {"source": path, "type": "h5", "content": {name: str(_decode(node[()]))},
+                   "suggested_label": suggested}
+            return
+
+        total = node.shape[0]
+        is_image = _is_image_tensor(node)
+        label_node = _find_label_dataset(node) if _uses_label_dataset(node) else None
+        window = config.H5_WINDOW_SIZE if (node.ndim == 1 and not node.dtype.names) else 1
+        step = max(_slice_rows(node), window)
+        step -= step % window
+
+        for start in range(0, total, step):
+            stop = min(start + step, total)
+            block = node[start:stop]
+            labels = label_node[start:stop] if label_node is not None else None
+
+            for offset in range(0, stop - start, window):
+                row_idx = start + offset
+                row_label = str(_decode(labels[offset])).lower().strip() if labels is not None else suggested
+                doc = {"source": path, "type": "h5", "suggested_label": row_label}
+
+                if is_image:
+                    doc["content"] = f"{name} [{row_idx}]"
+                    doc["image_array"] = _to_rgb_array(block[offset])
+                elif node.dtype.names:
+                    row = block[offset]
+                    doc["content"] = {field: _decode(row[field]) for field in node.dtype.names}
+                elif window > 1:
+                    values = block[offset:offset + window]
+                    doc["content"] = {f"{name}[{row_idx}:{row_idx + len(values)}]":
+                                      " ".join(str(_decode(v)) for v in values)}
+                else:
+                    row = block[offset]
+                    doc["content"] = {f"{name}[{row_idx}]": str(_decode(row)) if np.ndim(row) == 0
+                                      else " ".join(str(_decode(v)) for v in np.ravel(row))}
+                yield doc
+
+    def load(self, path: str, valid_labels=None) -> list:
+        """Charge un H5 complet (compatibilité : préférer iter_batches)."""
+        return [doc for batch in self.iter_batches(path, valid_labels) for doc in batch]
@@ -3,6 +3,7 @@ import numpy as np
 from PIL import Image
 from paddleocr import PaddleOCR
 from src.ingestion.loaders.base_loader import BaseLoader
+from src.ingestion.image_prep import clip_ready_array
 from src import config
 
 # Instance globale pour le processus en cours (évite de recharger le modèle à chaque fichier)
@@ -11,8 +12,9 @@ _ocr_engine = None
 def get_ocr_engine():
     global _ocr_engine
     if _ocr_engine is None:
-        # On utilise config.OCR_LANG au lieu de 'fr'
-        _ocr_engine = PaddleOCR(use_angle_cls=True, lang=config.OCR_LANG, show_log=False)
+        # On utilise config.OCR_LANG au lieu de 'fr' (CPU forcé pour la stabilité Windows)
+        _ocr_engine = PaddleOCR(use_angle_cls=True, lang=config.OCR_LANG, show_log=False,
+                                use_gpu=not config.OCR_FORCE_CPU)
     return _ocr_engine
 
 class ImageLoader(BaseLoader):
@@ -24,13 +26,15 @@ class ImageLoader(BaseLoader):
 
     def load(self, path: str, valid_labels=None) -> list:
         try:
-            # 1. Chargement Image
-            img = Image.open(path).convert("RGB")
+            # 1. Chargement Image (pleine résolution : nécessaire à l'OCR)
+            with Image.open(path) as raw:
+                img = raw.convert("RGB")
             
             # 2. Extraction OCR via Paddle
             engine = get_ocr_engine()
             img_array = np.array(img) # Paddle veut du Numpy, pas du PIL
             result = engine.ocr(img_array)
+            del img_array
             
             ocr_text = ""
             if result and result[0]:
@@ -38,12 +42,16 @@ class ImageLoader(BaseLoader):
                 texts = [line[1][0] for line in result[0] if line[1][1] > 0.6]
                 ocr_text = " ".join(texts)
 
+            # 3. Tenseur prêt pour CLIP (224x224) : le bitmap complet ne quitte jamais le worker
+            clip_array = clip_ready_array(img)
+            img.close()
+
             return [{
                 "source": path,
                 "type": "image",
-                "image": img,  # L'objet PIL est gardé pour la vectorisation CLIP plus tard
+                "image_array": clip_array,
                 "content": ocr_text
             }]
         except Exception as e:
             # On retourne une liste vide en cas d'erreur pour ne pas bloquer le workflow
-            return []
\ No newline at end of file
+            return []
@@ -1,36 +1,142 @@
 # src/ingestion/loaders/json_loader.py
 import json
+from src import config
 from src.ingestion.loaders.base_loader import BaseLoader
+from src.utils.logger import setup_logger
+
+logger = setup_logger("JSONLoader")
+
+JSON_LINES_EXTENSIONS = (".jsonl", ".ndjson")
+JSON_EXTENSIONS = (".json", *JSON_LINES_EXTENSIONS)
+# Caractères admis après un élément de tableau
+ELEMENT_END = " \t\r\n,]"
+
+def _project_hook(key):
+    """object_pairs_hook qui ne garde que `key` : aucun dict complet n'est construit."""
+    def hook(pairs):
+        for k, v in pairs:
+            if k == key:
+                return {k: v}
+        return {}
+    return hook
+
+def _iter_json_array(f, decoder, buffer_size):
+    """Parse un tableau JSON élément par élément en lisant le fichier par blocs."""
+    buf, pos, eof = "", 0, False
+
+    def fill(size):
+        nonlocal buf, pos, eof
+        chunk = f.read(size)
+        if not chunk:
+            eof = True
+        buf = buf[pos:] + chunk
+        pos = 0
+
+    fill(buffer_size)
+    # On saute le '[' d'ouverture (précédé d'espaces éventuellement plus longs qu'un bloc)
+    while "[" not in buf and not eof:
+        fill(buffer_size)
+    pos = buf.index("[") + 1
+    read_size = buffer_size
+
+    while True:
+        # Séparateurs (espaces, virgules) entre éléments
+        while True:
+            while pos < len(buf) and buf[pos] in " \t\r\n,":
+                pos += 1
+            if pos < len(buf) or eof: break
+            fill(read_size)
+        if pos >= len(buf) or buf[pos] == "]":
+            return
+
+        try:
+            obj, end = decoder.raw_decode(buf, pos)
+            # Un scalaire coupé dans le bloc (ex. "15000000000" avant ".0") se décode à tort :
+            # l'élément n'est accepté que suivi d'un séparateur ou de la fin du fichier
+            if (end == len(buf) and not eof) or (end < len(buf) and buf[end] not in ELEMENT_END):
+                raise json.JSONDecodeError("Élément incomplet", buf, end)
+        except json.JSONDecodeError:
+            if eof: raise
+            # Élément plus grand que le bloc : on lit davantage (taille doublée)
+            fill(read_size)
+            read_size *= 2
+            continue
+
+        read_size = buffer_size
+        pos = end
+        yield obj
+
+        # Compactage du tampon pour garder une RAM bornée
+        if pos > buffer_size:
+            buf, pos = buf[pos:], 0
+
+def iter_json_records(path, key=None):
+    """
+    Génère les enregistrements d'un fichier JSON / JSONL / NDJSON sans le charger en entier.
+    - Tableau [] : un élément à la fois (parser incrémental).
+    - Objet {} : le fichier entier est UN enregistrement.
+    - JSONL/NDJSON : une ligne = un enregistrement.
+    Avec `key`, seuls les champs `key` sont conservés (projection).
+    """
+    decoder = json.JSONDecoder(object_pairs_hook=_project_hook(key)) if key else json.JSONDecoder()
+    buffer_size = config.FILE_READ_BUFFER_SIZE
+
+    with open(path, "r", encoding="utf-8") as f:
+        if path.lower().endswith(JSON_LINES_EXTENSIONS):
+            for line in f:
+                line = line.strip()
+                if not line: continue
+                try:
+                    yield decoder.decode(line)
+                except json.JSONDecodeError:
+                    continue
+            return
+
+        head = f.read(buffer_size)
+        stripped = head.lstrip()
+        f.seek(0)
+        if stripped.startswith("["):
+            yield from _iter_json_array(f, decoder, buffer_size)
+        elif stripped:
+            yield decoder.decode(f.read())
+
+def iter_json_key(path, key):
+    """Projection d'une seule clé (skip-list) : valeurs de `key` enregistrement par enregistrement."""
+    for record in iter_json_records(path, key=key):
+        if isinstance(record, dict):
+            yield record.get(key, "")
 
 class JSONLoader(BaseLoader):
     def get_supported_extensions(self):
-        return [".json"]
+        return list(JSON_EXTENSIONS)
 
     def can_handle(self, extension: str) -> bool:
         return extension.lower() in self.get_supported_extensions()
 
-    def load(self, path: str, valid_labels=None) -> list:
+    def iter_batches(self, path: str, valid_labels=None, batch_size: int = 64, **options):
         """
-        Approche généraliste : 
-        - Si c'est une liste [], chaque élément est un document.
+        Approche généraliste en streaming :
+        - Si c'est une liste [] (ou du JSONL), chaque élément est un document.
         - Si c'est un objet {}, le fichier entier est UN document.
         """
+        batch = []
         try:
-            with open(path, 'r', encoding='utf-8') as f:
-                data = json.load(f)
-        except Exception:
-            return []
-
-        records = data if isinstance(data, list) else [data]
-        
-        docs = []
-        for record in records:
-            if isinstance(record, dict):
-                docs.append({
+            for record in iter_json_records(path):
+                if not isinstance(record, dict): continue
+                batch.append({
                     "source": path,
                     "type": "json",
-                    "content": record, 
-                    "suggested_label": None 
+                    "content": record,
+                    "suggested_label": None
                 })
-            
-        return docs
\ No newline at end of file
+                if len(batch) >= batch_size:
+                    yield batch
+                    batch = []
+        except Exception as e:
+            logger.error(f"Lecture interrompue ({path}) : {e}")
+        if batch:
+            yield batch
+
+    def load(self, path: str, valid_labels=None) -> list:
+        """Charge un JSON complet (compatibilité : préférer iter_batches)."""
+        return [doc for batch in self.iter_batches(path, valid_labels) for doc in batch]
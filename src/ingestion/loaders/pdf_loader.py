@@ -1,6 +1,10 @@
 # src/ingestion/loaders/pdf_loader.py
-import fitz  
+import fitz
+from src import config
 from src.ingestion.loaders.base_loader import BaseLoader
+from src.utils.logger import setup_logger
+
+logger = setup_logger("PDFLoader")
 
 class PDFLoader(BaseLoader):
     def get_supported_extensions(self):
@@ -9,21 +13,43 @@ class PDFLoader(BaseLoader):
     def can_handle(self, extension: str) -> bool:
         return extension.lower() in self.get_supported_extensions()
 
-    def load(self, path: str, valid_labels=None) -> list:
-        pages_content = []
+    def iter_batches(self, path: str, valid_labels=None, batch_size: int = 64, page_range=None):
+        """
+        Un document par fenêtre de PDF_PAGES_PER_DOC pages, émis au fil de l'extraction.
+        `page_range` (début, fin) permet à l'ordonnanceur de répartir un gros PDF sur plusieurs workers.
+        Le premier document du fichier porte `file_marker` : il garde le hash du fichier (delta-check).
+        """
+        batch = []
+        marker_pending = not page_range or page_range[0] == 0
         try:
             with fitz.open(path) as doc:
-                for page in doc:
+                last_page = min(doc.page_count, config.PDF_MAX_PAGES)
+                first, stop = page_range if page_range else (0, last_page)
+                stop = min(stop if stop is not None else last_page, last_page)
+                window = max(1, config.PDF_PAGES_PER_DOC)
+
+                for start in range(first, stop, window):
+                    end = min(start + window, stop)
+                    text = "\n".join(str(doc[p].get_text("text")) for p in range(start, end))
+                    if not text.strip(): continue
 
-                    page_text = str(page.get_text("text"))
-                    pages_content.append(page_text)
-            
-            full_text = "\n".join(pages_content)
-            
-            return [{
-                "source": path,
-                "type": "pdf",
-                "content": full_text
-            }]
-        except Exception:
-            return []
\ No newline at end of file
+                    batch.append({
+                        "source": path,
+                        "type": "pdf",
+                        "content": text,
+                        "doc_key": f"p{start}",
+                        "extra": {"pages": [start + 1, end]},
+                        "file_marker": marker_pending
+                    })
+                    marker_pending = False
+                    if len(batch) >= batch_size:
+                        yield batch
+                        batch = []
+        except Exception as e:
+            logger.error(f"Lecture interrompue ({path}) : {e}")
+        if batch:
+            yield batch
+
+    def load(self, path: str, valid_labels=None) -> list:
+        """Charge un PDF complet (compatibilité : préférer iter_batches)."""
+        return [doc for batch in self.iter_batches(path, valid_labels) for doc in batch]
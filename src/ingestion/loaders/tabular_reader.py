@@ -0,0 +1,63 @@
+# src/ingestion/loaders/tabular_reader.py
+import csv
+import pyarrow as pa
+from pyarrow import csv as pa_csv
+
+# Taille d'un bloc lu par pyarrow : la RAM du loader reste bornée quelle que soit la taille du fichier
+STREAM_BLOCK_SIZE = 1 << 20
+
+def _read_header(path, delimiter):
+    # utf-8-sig : un BOM ne doit pas rester collé au nom de la première colonne
+    with open(path, "r", encoding="utf-8-sig", errors="ignore", newline="") as f:
+        return next(csv.reader(f, delimiter=delimiter), [])
+
+def iter_record_batches(path, delimiter=",", block_size=STREAM_BLOCK_SIZE):
+    """
+    Lecteur CSV/TSV en streaming (pyarrow) : génère des RecordBatch au fil du fichier.
+    Toutes les colonnes sont lues en texte pour éviter les conflits de typage entre blocs.
+    newlines_in_values : une cellule entre guillemets peut contenir des retours à la ligne
+    (sinon le découpage en blocs se désynchronise au premier bloc qui en coupe une).
+    """
+    header = [str(c).strip() for c in _read_header(path, delimiter)]
+    if not header:
+        return
+
+    reader = pa_csv.open_csv(
+        path,
+        read_options=pa_csv.ReadOptions(block_size=block_size, column_names=header, skip_rows=1),
+        parse_options=pa_csv.ParseOptions(delimiter=delimiter, newlines_in_values=True,
+                                          invalid_row_handler=lambda row: "skip"),
+        convert_options=pa_csv.ConvertOptions(
+            column_types={name: pa.string() for name in header},
+            strings_can_be_null=True
+        )
+    )
+    for record_batch in reader:
+        if record_batch.num_rows:
+            yield record_batch
+
+class TabularBlock:
+    """
+    Lot de lignes CSV/TSV d'un fichier, laissé en colonnes Arrow (tranche du RecordBatch lu).
+    Transmis tel quel au transport (DocumentBatch.from_tabular) : aucun dict par ligne.
+    """
+    __slots__ = ("source", "type", "record_batch")
+
+    def __init__(self, source, type, record_batch):
+        self.source = source
+        self.type = type
+        self.record_batch = record_batch
+
+    def __len__(self):
+        return self.record_batch.num_rows
+
+    def to_docs(self):
+        """Documents dict (compatibilité : load())."""
+        return [{"source": self.source, "type": self.type, "content": record, "suggested_label": None}
+                for record in self.record_batch.to_pylist()]
+
+def iter_tabular_blocks(path, doc_type, delimiter=",", batch_size=64):
+    """Génère des TabularBlock d'au plus `batch_size` lignes (tranches sans copie)."""
+    for record_batch in iter_record_batches(path, delimiter):
+        for i in range(0, record_batch.num_rows, batch_size):
+            yield TabularBlock(path, doc_type, record_batch.slice(i, batch_size))
@@ -1,6 +1,9 @@
 # src/ingestion/loaders/tsv_loader.py
-import pandas as pd
 from src.ingestion.loaders.base_loader import BaseLoader
+from src.ingestion.loaders.tabular_reader import iter_tabular_blocks
+from src.utils.logger import setup_logger
+
+logger = setup_logger("TSVLoader")
 
 class TSVLoader(BaseLoader):
     def get_supported_extensions(self):
@@ -9,23 +12,16 @@ class TSVLoader(BaseLoader):
     def can_handle(self, extension: str) -> bool:
         return extension.lower() in self.get_supported_extensions()
 
-    def load(self, path: str, valid_labels=None) -> list:
-        """Charge un TSV (Tab-Separated Values) de manière performante."""
+    def iter_batches(self, path: str, valid_labels=None, batch_size: int = 64, **options):
+        """
+        Lecture streaming d'un TSV (Tab-Separated Values) par blocs bornés.
+        Les lignes restent en colonnes Arrow (TabularBlock) jusqu'au parent.
+        """
         try:
-            df = pd.read_csv(path, sep='\t', low_memory=False)
-            df.columns = [c.strip() for c in df.columns]
-        except Exception:
-            return []
+            yield from iter_tabular_blocks(path, "tsv", delimiter="\t", batch_size=batch_size)
+        except Exception as e:
+            logger.error(f"Lecture interrompue ({path}) : {e}")
 
-        records = df.to_dict(orient='records')
-        
-        docs = []
-        for record in records:
-            docs.append({
-                "source": path,
-                "type": "tsv",
-                "content": record,
-                "suggested_label": None 
-            })
-            
-        return docs
\ No newline at end of file
+    def load(self, path: str, valid_labels=None) -> list:
+        """Charge un TSV complet (compatibilité : préférer iter_batches)."""
+        return [doc for block in self.iter_batches(path, valid_labels) for doc in block.to_docs()]
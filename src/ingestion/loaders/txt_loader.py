@@ -1,7 +1,17 @@
 # ingestion/loaders/txt_loader.py
-import os
+from itertools import islice, chain
+from src import config
 from src.utils.preprocessing import clean_text
 from src.ingestion.loaders.base_loader import BaseLoader
+from src.indexing.hash_index import HashBloomFilter
+from src.utils.logger import setup_logger
+
+logger = setup_logger("TXTLoader")
+
+# Préfixe échantillonné pour trancher liste / prose
+SAMPLE_LINES = 20
+# En mode prose, seul le début est utile (contenu tronqué à 20 000 caractères en aval)
+PROSE_MAX_CHARS = 40000
 
 class TXTLoader(BaseLoader):
     def get_supported_extensions(self):
@@ -10,36 +20,59 @@ class TXTLoader(BaseLoader):
     def can_handle(self, extension: str) -> bool:
         return extension.lower() in self.get_supported_extensions()
 
-    def load(self, path: str, valid_labels=None) -> list:
-        docs = []
+    def iter_batches(self, path: str, valid_labels=None, batch_size: int = 64, **options):
+        """
+        Lecture streaming : le mode (liste / prose) est décidé sur un préfixe,
+        les listes sont émises par lots de lignes dédoublonnées.
+        """
         try:
             with open(path, "r", encoding="utf-8", errors="ignore") as f:
-                lines = f.readlines()
-
-            is_list = False
-            if len(lines) > 2:
-                sample = lines[:20]
-                avg_len = sum(len(l.split()) for l in sample) / len(sample)
-                if avg_len < 15:
-                    is_list = True
-
-            if is_list:
-                for line in lines:
-                    cleaned = clean_text(line)
-                    if len(cleaned) > 2:
-                        docs.append({
-                            "source": path,
-                            "type": "txt",
-                            "content": cleaned,
-                            "suggested_label": cleaned 
-                        })
-            else:
-                cleaned = clean_text("".join(lines))
-                docs.append({
-                    "source": path,
-                    "type": "txt",
-                    "content": cleaned
-                })
-        except Exception:
-            pass
-        return docs
\ No newline at end of file
+                sample = list(islice(f, SAMPLE_LINES))
+
+                is_list = False
+                if len(sample) > 2:
+                    avg_len = sum(len(l.split()) for l in sample) / len(sample)
+                    if avg_len < 15:
+                        is_list = True
+
+                if is_list:
+                    yield from self._iter_list_batches(path, chain(sample, f), batch_size)
+                else:
+                    head = "".join(sample)
+                    head += f.read(max(0, PROSE_MAX_CHARS - len(head)))
+                    yield [{
+                        "source": path,
+                        "type": "txt",
+                        "content": clean_text(head)
+                    }]
+        except Exception as e:
+            logger.error(f"Lecture interrompue ({path}) : {e}")
+
+    def _iter_list_batches(self, path, lines, batch_size):
+        # Lignes déjà émises (Bloom, mémoire fixe) : une ligne répétée n'atteint jamais embed_text_batch
+        seen = HashBloomFilter(config.TXT_DEDUP_MAX_LINES, config.TXT_DEDUP_ERROR_RATE)
+        batch = []
+        for line in lines:
+            cleaned = clean_text(line)
+            if len(cleaned) <= 2: continue
+
+            if cleaned in seen: continue
+            # Filtre plein : on cesse d'ajouter pour ne pas dégrader le taux de faux positifs
+            if not seen.saturated:
+                seen.add(cleaned)
+
+            batch.append({
+                "source": path,
+                "type": "txt",
+                "content": cleaned,
+                "suggested_label": cleaned
+            })
+            if len(batch) >= batch_size:
+                yield batch
+                batch = []
+        if batch:
+            yield batch
+
+    def load(self, path: str, valid_labels=None) -> list:
+        """Charge un TXT complet (compatibilité : préférer iter_batches)."""
+        return [doc for batch in self.iter_batches(path, valid_labels) for doc in batch]
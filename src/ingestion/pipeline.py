@@ -0,0 +1,137 @@
+# src/ingestion/pipeline.py
+import queue
+import threading
+from src import config
+from src.utils.logger import setup_logger
+from src.ingestion.batch import DocumentBatch
+from src.ingestion.tabular import split_tabular_rows
+from src.ingestion.core import (
+    load_batch_images, release_batch_images, vectorize_batch, submit_vectorize_batch,
+    prepare_batch_metadata, write_batch
+)
+
+logger = setup_logger("IngestionPipeline")
+
+# Marqueur de fin de flux propagé d'étage en étage
+_END_OF_STREAM = object()
+
+class IngestionPipeline:
+    """
+    Pipeline à étages : Décodage -> Vectorisation -> Métadonnées -> Écriture.
+    Chaque étage tourne dans son propre thread et communique via des files bornées :
+    quand un étage sature, l'étage amont se bloque (backpressure) au lieu d'empiler en RAM.
+    Les workers OCR (étage de chargement) continuent donc pendant que CLIP et LanceDB travaillent.
+    """
+
+    def __init__(self, context, queue_size=None, embed_pool=None):
+        self.context = context
+        size = queue_size or config.PIPELINE_QUEUE_SIZE
+        # Pool d'inférence CLIP (CPU) : les batches y sont soumis sans attendre,
+        # la file vers l'étage Métadonnées doit donc pouvoir contenir un batch en vol par processus
+        self.embed_pool = embed_pool if embed_pool is not None and embed_pool.active else None
+        in_flight = self.embed_pool.workers if self.embed_pool else 0
+
+        self._decode_q = queue.Queue(maxsize=size)
+        self._embed_q = queue.Queue(maxsize=size)
+        self._meta_q = queue.Queue(maxsize=size + in_flight)
+        self._write_q = queue.Queue(maxsize=size)
+
+        # Résultats agrégés (mis à jour uniquement par l'étage d'écriture)
+        self.indexed_count = 0
+        self.detected_domain = "unknown"
+        self.best_confidence = 0.0
+
+        self._threads = [
+            threading.Thread(target=self._run_stage, name="pipe_decode",
+                             args=(self._decode_q, self._embed_q, self._decode), daemon=True),
+            threading.Thread(target=self._run_stage, name="pipe_embed",
+                             args=(self._embed_q, self._meta_q, self._embed), daemon=True),
+            threading.Thread(target=self._run_stage, name="pipe_meta",
+                             args=(self._meta_q, self._write_q, self._metadata), daemon=True),
+            threading.Thread(target=self._run_stage, name="pipe_write",
+                             args=(self._write_q, None, self._write), daemon=True),
+        ]
+        self._started = False
+
+    def start(self):
+        for t in self._threads:
+            t.start()
+        self._started = True
+        return self
+
+    def submit(self, batch_docs):
+        """Injecte un batch dans le pipeline (bloquant si l'étage de décodage est saturé)."""
+        if not batch_docs: return
+        if not self._started: self.start()
+        self._decode_q.put(batch_docs if isinstance(batch_docs, DocumentBatch) else list(batch_docs))
+
+    def close(self):
+        """Vide le pipeline et attend la fin de tous les étages."""
+        if self._started:
+            self._decode_q.put(_END_OF_STREAM)
+            for t in self._threads:
+                t.join()
+        return self.indexed_count, self.detected_domain, self.best_confidence
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+    # --- BOUCLE GÉNÉRIQUE D'UN ÉTAGE ---
+    def _run_stage(self, in_q, out_q, handler):
+        while True:
+            item = in_q.get()
+            if item is _END_OF_STREAM:
+                if out_q is not None: out_q.put(_END_OF_STREAM)
+                break
+            try:
+                result = handler(item)
+            except Exception as e:
+                # Un batch en échec est perdu, mais l'étage reste vivant (pas de deadlock amont)
+                logger.error(f"Erreur étage {threading.current_thread().name} : {e}")
+                continue
+            if result is not None and out_q is not None:
+                out_q.put(result)
+
+    # --- ÉTAGES ---
+    def _decode(self, batch_docs):
+        # Préchargement : le batch suivant est décodé (pool de threads) pendant que CLIP vectorise le courant
+        # DocumentBatch (Arrow) -> lignes CSV/TSV laissées en colonnes + vues ligne à __slots__ pour le reste
+        tabular = None
+        if isinstance(batch_docs, DocumentBatch):
+            tabular, batch_docs = split_tabular_rows(batch_docs, self.context)
+        return batch_docs, tabular, load_batch_images(batch_docs)
+
+    def _embed(self, item):
+        batch_docs, tabular, actual_images = item
+        try:
+            if self.embed_pool:
+                # Soumission non bloquante : le résultat est attendu par l'étage Métadonnées
+                collect = submit_vectorize_batch(batch_docs, actual_images, self.embed_pool, tabular)
+                return batch_docs, tabular, actual_images, collect
+            vectors = vectorize_batch(batch_docs, actual_images, tabular)
+        except Exception as e:
+            logger.error(f"Erreur fatale lors de la vectorisation du batch : {e}")
+            release_batch_images(actual_images)
+            return None
+        return batch_docs, tabular, actual_images, lambda: vectors
+
+    def _metadata(self, item):
+        batch_docs, tabular, actual_images, collect = item
+        try:
+            text_vectors, image_vectors = collect()
+        except Exception as e:
+            logger.error(f"Erreur fatale lors de la vectorisation du batch : {e}")
+            release_batch_images(actual_images)
+            return None
+        return prepare_batch_metadata(batch_docs, actual_images, text_vectors, image_vectors,
+                                      self.context, tabular)
+
+    def _write(self, item):
+        columns, vectors, domain, score = item
+        self.indexed_count += write_batch(columns, vectors)
+        if domain != "unknown":
+            self.detected_domain = domain
+            self.best_confidence = score
@@ -0,0 +1,62 @@
+# src/ingestion/quarantine.py
+import os
+import json
+import time
+from src import config
+from src.utils.logger import setup_logger
+
+logger = setup_logger("Quarantine")
+QUARANTINE_FILE = config.QUARANTINE_PATH
+
+# --- ÉTAT GLOBAL (clé : calculate_fast_hash du fichier) ---
+_QUARANTINE = {}
+_LOADED = False
+_SESSION_ENTRIES = []
+
+def load_quarantine():
+    global _QUARANTINE, _LOADED
+    if _LOADED:
+        return
+
+    if os.path.exists(QUARANTINE_FILE):
+        try:
+            with open(QUARANTINE_FILE, "r", encoding="utf-8") as f:
+                data = json.load(f)
+                if isinstance(data, dict):
+                    _QUARANTINE.update(data)
+        except Exception:
+            _QUARANTINE = {}
+
+    _LOADED = True
+
+def save_quarantine():
+    """Sauvegarde immédiate : un crash suivant ne doit pas faire oublier le fichier fautif."""
+    try:
+        with open(QUARANTINE_FILE, "w", encoding="utf-8") as f:
+            json.dump(_QUARANTINE, f, indent=4, ensure_ascii=False)
+    except Exception as e:
+        logger.error(f"Erreur sauvegarde quarantaine : {e}")
+
+def is_quarantined(file_hash) -> bool:
+    load_quarantine()
+    return file_hash in _QUARANTINE
+
+def quarantine_file(file_hash, file_path, reason):
+    """Met un fichier pathologique en quarantaine (ignoré par les runs suivants)."""
+    load_quarantine()
+    entry = {"source": str(file_path), "reason": reason, "quarantined_at": time.time()}
+    _QUARANTINE[file_hash] = entry
+    _SESSION_ENTRIES.append(entry)
+    save_quarantine()
+    logger.warning(f" QUARANTAINE : {os.path.basename(str(file_path))} ({reason})")
+
+def report_quarantine():
+    """Bilan de fin de run : fichiers mis en quarantaine pendant cette session."""
+    load_quarantine()
+    if not _SESSION_ENTRIES:
+        return []
+    logger.warning(f"{len(_SESSION_ENTRIES)} fichier(s) mis en quarantaine pendant ce run "
+                   f"({len(_QUARANTINE)} au total dans {QUARANTINE_FILE.name}) :")
+    for entry in _SESSION_ENTRIES:
+        logger.warning(f"   - {entry['source']} -> {entry['reason']}")
+    return list(_SESSION_ENTRIES)
@@ -0,0 +1,119 @@
+# src/ingestion/scheduler.py
+import os
+from src import config
+from src.utils.logger import setup_logger
+from src.ingestion.dispatcher import VISUAL_EXTENSIONS
+from src.ingestion.quarantine import quarantine_file
+
+logger = setup_logger("IngestionScheduler")
+
+# Coût fixe par fichier (ouverture, modèle OCR...) et coût par Mo, en unités arbitraires
+FIXED_COST = {'.pdf': 2.0, '.h5': 1.0, **{ext: 5.0 for ext in VISUAL_EXTENSIONS}}
+COST_PER_MB = {'.pdf': 8.0, '.h5': 0.5, '.txt': 1.0, '.csv': 1.5, '.tsv': 1.5, '.json': 2.0,
+               **{ext: 10.0 for ext in VISUAL_EXTENSIONS}}
+
+# Fréquence de contrôle des budgets (temps / mémoire) des workers occupés
+POLL_INTERVAL = 0.5
+
+# Découpage des gros PDF : estimation du nombre de pages sans ouvrir le fichier
+PDF_BYTES_PER_PAGE_ESTIMATE = 100 * 1024
+
+def estimate_task_cost(path):
+    """Estime le coût d'un fichier à partir de sa taille et de son type (sans l'ouvrir)."""
+    ext = os.path.splitext(path)[1].lower()
+    try:
+        size_mb = os.path.getsize(path) / (1024 * 1024)
+    except OSError:
+        size_mb = 0.0
+    return FIXED_COST.get(ext, 0.5) + size_mb * COST_PER_MB.get(ext, 1.0)
+
+def _estimate_pdf_pages(path):
+    try:
+        return max(1, os.path.getsize(path) // PDF_BYTES_PER_PAGE_ESTIMATE)
+    except OSError:
+        return 1
+
+def expand_tasks(tasks):
+    """
+    Découpe les gros PDF en sous-tâches de PDF_SPLIT_PAGES pages réparties sur les workers.
+    Le fichier n'est pas ouvert ici (un PDF corrompu ne doit jamais bloquer le parent) :
+    la dernière plage est ouverte et les plages au-delà du vrai nombre de pages sont vides.
+    """
+    expanded = []
+    for file_path, file_hash, options in tasks:
+        is_large_pdf = file_path.lower().endswith(".pdf") and \
+            _estimate_pdf_pages(file_path) > config.PDF_SPLIT_PAGES
+        if options or not is_large_pdf:
+            expanded.append((file_path, file_hash, options))
+            continue
+
+        pages = min(_estimate_pdf_pages(file_path), config.PDF_MAX_PAGES)
+        starts = list(range(0, pages, config.PDF_SPLIT_PAGES))
+        for i, start in enumerate(starts):
+            end = starts[i + 1] if i + 1 < len(starts) else None
+            expanded.append((file_path, file_hash, {"page_range": (start, end)}))
+    return expanded
+
+def task_cost(task):
+    file_path, _, options = task
+    cost = estimate_task_cost(file_path)
+    if options and "page_range" in options:
+        cost *= config.PDF_SPLIT_PAGES / max(config.PDF_SPLIT_PAGES, _estimate_pdf_pages(file_path))
+    return cost
+
+class TaskScheduler:
+    """
+    Ordonnanceur par ordre de complétion : les tâches les plus coûteuses partent en premier
+    (Longest Processing Time), les petites comblent ensuite les workers inactifs.
+    Les résultats sont rendus dès qu'ils sont prêts (y compris par lots en cours de fichier),
+    sans attendre les tâches plus anciennes.
+    Chaque tâche a un budget temps/mémoire : un worker qui le dépasse est tué et relancé,
+    et son fichier part en quarantaine.
+    """
+
+    def __init__(self, pool, timeout=None, memory_limit_mb=None):
+        self.pool = pool
+        self.timeout = timeout or config.TASK_TIMEOUT
+        self.memory_limit_mb = memory_limit_mb or config.TASK_MEMORY_LIMIT_MB
+
+    def run(self, tasks):
+        """
+        Génère (task, DocumentBatch | None, done) au fil des lots et des complétions.
+        `done` n'est vrai qu'une fois par fichier, quand toutes ses sous-tâches sont finies.
+        """
+        pending = sorted(expand_tasks(tasks), key=task_cost, reverse=True)
+        pending.reverse()  # pop() en O(1) depuis la fin = tâche la plus lourde restante
+        remaining = {}
+        for file_path, _, _ in pending:
+            remaining[file_path] = remaining.get(file_path, 0) + 1
+
+        def finish(task, docs):
+            remaining[task[0]] -= 1
+            return task, docs, remaining[task[0]] == 0
+
+        while pending or self.pool.busy_slots():
+            for slot in self.pool.idle_slots():
+                if not pending: break
+                self.pool.assign(slot, pending.pop())
+
+            for task, docs, done in self.pool.collect(timeout=POLL_INTERVAL):
+                yield finish(task, docs) if done else (task, docs, False)
+
+            for slot in self.pool.busy_slots():
+                reason = self._budget_violation(slot)
+                if reason:
+                    task = slot.task
+                    self.pool.restart(slot)
+                    quarantine_file(task[1], task[0], reason)
+                    yield finish(task, None)
+
+    def _budget_violation(self, slot):
+        if not slot.process.is_alive():
+            return f"crash (exit code {slot.process.exitcode})"
+        elapsed = self.pool.elapsed(slot)
+        if elapsed > self.timeout:
+            return f"timeout ({elapsed:.0f}s > {self.timeout}s)"
+        memory = self.pool.memory_mb(slot)
+        if memory > self.memory_limit_mb:
+            return f"memory ({memory:.0f} Mo > {self.memory_limit_mb} Mo)"
+        return None
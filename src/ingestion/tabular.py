@@ -0,0 +1,154 @@
+# src/ingestion/tabular.py
+import os
+from collections import defaultdict
+import numpy as np
+import pyarrow as pa
+import pyarrow.compute as pc
+
+# Types dont chaque document est une ligne (dict colonne -> valeur)
+TABULAR_TYPES = {"csv", "tsv", "json"}
+
+def is_tabular_doc(doc) -> bool:
+    return doc.get("type") in TABULAR_TYPES and isinstance(doc.get("content"), dict)
+
+def is_list_line(doc) -> bool:
+    """Ligne d'un TXT en mode liste : le TXTLoader la propose elle-même comme label."""
+    return doc.get("type") == "txt" and doc.get("suggested_label") is not None
+
+def get_sealed_label_key(source_path, context, record=None):
+    """
+    Colonne label scellée par _discover_file_plan pour ce fichier (ou None).
+    Avec `record`, la clé doit en être une colonne réelle (sinon None : la réponse du LLM
+    peut être mal recopiée, et la voie ligne à ligne garde ses replis).
+    """
+    plans = context.get("file_plans", {}) if isinstance(context, dict) else {}
+    plan = plans.get(os.path.abspath(source_path).lower())
+    label_key = plan.get("label_key") if plan else None
+    if not label_key or label_key == "unknown":
+        return None
+    if record is not None and label_key not in record:
+        return None
+    return label_key
+
+def group_indices(keys):
+    """Positions de chaque valeur de `keys` (ordre préservé)."""
+    groups = defaultdict(list)
+    for i, key in enumerate(keys):
+        groups[key].append(i)
+    return groups
+
+def group_by_source(batch_docs, indices):
+    """Regroupe des indices de documents par fichier source (ordre préservé)."""
+    groups = defaultdict(list)
+    for i in indices:
+        groups[batch_docs[i]["source"]].append(i)
+    return groups
+
+def _row_text(record):
+    return " ".join(f"{k} {v}" for k, v in record.items() if v is not None)
+
+def build_tabular_texts(records):
+    """
+    Texte d'embedding construit colonne par colonne ("colonne valeur ...").
+    Après clean_text, c'est le même contenu que str(record), sans les None.
+    """
+    if not records: return []
+    columns = list(records[0].keys())
+    if any(r.keys() != records[0].keys() for r in records):
+        # Schéma hétérogène (JSON) : repli ligne par ligne
+        return [_row_text(r) for r in records]
+
+    cells = [[f"{col} {v}" if v is not None else "" for v in (r[col] for r in records)] for col in columns]
+    return [" ".join(c for c in row if c) for row in zip(*cells)]
+
+def extract_label_column(records, label_key):
+    """Labels extraits en une passe sur la colonne scellée."""
+    return [str(v).lower().strip() if v is not None else "unknown" for v in (r.get(label_key) for r in records)]
+
+# --- LIGNES CSV/TSV EN COLONNES ARROW (colonne `cells` du transport) ---
+def _cell_entries(cells):
+    """(clés, valeurs, n° de ligne de chaque cellule) d'un MapArray, tranches comprises."""
+    if isinstance(cells, pa.ChunkedArray):
+        cells = cells.combine_chunks()
+    offsets = cells.offsets.to_numpy()
+    start, stop = int(offsets[0]), int(offsets[-1])
+    row_ids = np.repeat(np.arange(len(cells)), np.diff(offsets))
+    return cells.keys.slice(start, stop - start), cells.items.slice(start, stop - start), row_ids
+
+def cell_texts(cells):
+    """Même texte que build_tabular_texts ("colonne valeur ...", sans les nulls), calculé en Arrow."""
+    keys, items, row_ids = _cell_entries(cells)
+    parts = pc.binary_join_element_wise(keys, items, " ")
+    valid = pc.is_valid(parts).to_numpy(zero_copy_only=False)
+    counts = np.bincount(row_ids[valid], minlength=len(cells))
+    offsets = pa.array(np.concatenate([[0], np.cumsum(counts)]).astype(np.int32))
+    rows = pa.ListArray.from_arrays(offsets, parts.filter(pa.array(valid)))
+    return pc.binary_join(rows, " ").to_pylist()
+
+def cell_values(cells, key):
+    """Valeur de la colonne `key` pour chaque ligne (null si absente) et masque de présence."""
+    keys, items, row_ids = _cell_entries(cells)
+    match = pc.equal(keys, key).fill_null(False).to_numpy(zero_copy_only=False)
+    positions = np.full(len(cells), -1, dtype=np.int64)
+    positions[row_ids[match]] = np.flatnonzero(match)
+    present = positions >= 0
+    return items.take(pa.array(positions, mask=~present)), present
+
+def normalize_labels(values):
+    """Équivalent colonne d'extract_label_column sur des valeurs Arrow."""
+    return pc.utf8_lower(pc.utf8_trim_whitespace(values)).fill_null("unknown").to_pylist()
+
+class TabularRows:
+    """
+    Lignes CSV/TSV d'un DocumentBatch restées en colonnes Arrow (voie rapide) :
+    textes d'embedding et labels de la colonne scellée calculés colonne par colonne.
+    """
+    __slots__ = ("table", "texts", "labels")
+
+    def __init__(self, table, texts, labels):
+        self.table = table
+        self.texts = texts
+        self.labels = labels
+
+    def __len__(self):
+        return self.table.num_rows
+
+    def column(self, name):
+        return self.table.column(name).to_pylist()
+
+    def record(self, index):
+        """Une ligne en dict (décision de domaine, une fois par fichier)."""
+        return dict(self.table.column("cells")[index].as_py())
+
+def split_tabular_rows(batch, context):
+    """
+    Sépare un DocumentBatch en (TabularRows | None, vues ligne du reste).
+    Voie colonne : lignes CSV/TSV dont le fichier a une colonne label scellée, présente dans la ligne.
+    Les autres (pas de plan, clé absente) repassent par la voie ligne à ligne, en dict.
+    """
+    has_cells = batch.has_cells()
+    if not any(has_cells):
+        return None, batch.records()
+
+    sub = batch.filter(has_cells)
+    cells = sub.table.column("cells").combine_chunks()
+    sources = sub.table.column("source")
+    fast = np.zeros(len(sub), dtype=bool)
+    labels = np.empty(len(sub), dtype=object)
+    for source in pc.unique(sources).to_pylist():
+        label_key = get_sealed_label_key(source, context)
+        if not label_key: continue
+        rows = pc.equal(sources, source).to_numpy(zero_copy_only=False)
+        values, present = cell_values(cells, label_key)
+        selected = rows & present
+        fast |= selected
+        labels[selected] = np.array(normalize_labels(values.filter(pa.array(selected))), dtype=object)
+
+    tabular = None
+    if fast.any():
+        table = sub.table.filter(pa.array(fast))
+        tabular = TabularRows(table, cell_texts(table.column("cells")), labels[fast].tolist())
+
+    fast_iter = iter(fast)
+    rest = [not cell or not next(fast_iter) for cell in has_cells]
+    return tabular, batch.filter(rest).records()
@@ -0,0 +1,244 @@
+# src/ingestion/workers.py
+import os
+import time
+import hashlib
+import pickle
+import shutil
+import tempfile
+import multiprocessing
+from multiprocessing import resource_tracker
+from multiprocessing.connection import wait
+import psutil
+from src import config
+from src.utils.logger import setup_logger
+from src.ingestion.dispatcher import dispatch_batches
+from src.ingestion.image_prep import pack_batch_images
+from src.ingestion.batch import DocumentBatch
+from src.ingestion.loaders.tabular_reader import TabularBlock
+
+logger = setup_logger("IngestionWorkers")
+
+# État global du worker (vit pendant TOUT le run, pas seulement un dataset)
+_WORKER_CONTEXT = {}
+_WORKER_CONTEXT_VERSION = None
+
+# Protocole worker -> parent (send_bytes) : flux IPC Arrow par lot, puis message vide en fin de tâche
+MSG_DONE = b""
+
+def _init_worker():
+    """Charge PaddleOCR une seule fois par worker pour toute la durée du run."""
+    from src.ingestion.loaders.image_loader import get_ocr_engine
+    get_ocr_engine()
+
+def _sync_context(version, context_path):
+    """Recharge le contexte du dataset uniquement si sa version a changé."""
+    global _WORKER_CONTEXT, _WORKER_CONTEXT_VERSION
+    if version == _WORKER_CONTEXT_VERSION: return
+    with open(context_path, "rb") as f:
+        _WORKER_CONTEXT = pickle.load(f)
+    _WORKER_CONTEXT_VERSION = version
+
+def _worker_stream_file(args, emit):
+    """
+    Tâche légère : charge le contenu brut (Texte/OCR) et l'émet par lots bornés
+    au fil de la lecture, sans jamais matérialiser le fichier entier.
+    """
+    file_path, file_hash, options, version, context_path = args
+    try:
+        _sync_context(version, context_path)
+        held, index = None, 0
+        # dispatch_batches utilise context pour l'arbitrage visuel/label
+        for batch in dispatch_batches(file_path, valid_labels=_WORKER_CONTEXT,
+                                      batch_size=config.BATCH_SIZE, **(options or {})):
+            if not batch: continue
+            if isinstance(batch, TabularBlock):
+                # Lignes CSV/TSV : colonnes Arrow transmises telles quelles (hashes calculés en bloc)
+                batch.source = str(file_path)
+                hashes = [hashlib.md5(f"{file_hash}_{i}".encode()).hexdigest()
+                          for i in range(index, index + len(batch))]
+                index += len(batch)
+                doc_batch = DocumentBatch.from_tabular(batch, hashes)
+            else:
+                for doc in batch:
+                    # doc_key (ex: page PDF) : identité stable même si le fichier est découpé en sous-tâches
+                    doc_key = doc.pop('doc_key', index)
+                    doc['source'] = str(file_path)
+                    # file_marker : document portant le hash brut du fichier, reconnu par le delta-check
+                    if doc.pop('file_marker', False):
+                        doc['file_hash'] = file_hash
+                    else:
+                        doc['file_hash'] = hashlib.md5(f"{file_hash}_{doc_key}".encode()).hexdigest()
+                    index += 1
+                # Pixels via mémoire partagée (format CLIP), jamais dans le pickle du Pipe
+                pack_batch_images(batch)
+                doc_batch = DocumentBatch.from_docs(batch)
+
+            # Un seul document pour l'instant : on attend de savoir s'il y en aura d'autres
+            # (jamais pour une sous-tâche : le fichier a forcément plusieurs documents)
+            if index == 1 and not options:
+                held = doc_batch
+                continue
+            if held:
+                emit(held)
+                held = None
+            emit(doc_batch)
+
+        # Fichier mono-document : il garde le hash du fichier (delta-check)
+        if held:
+            held.set_file_hash(0, file_hash)
+            emit(held)
+    except Exception as e:
+        logger.error(f" Erreur worker sur {os.path.basename(file_path)} : {e}")
+
+def _worker_main(conn):
+    """Boucle d'un worker : une tâche à la fois, reçue et rendue sur son propre Pipe."""
+    try:
+        _init_worker()
+    except Exception as e:
+        # L'OCR sera retenté paresseusement par le loader ; on ne tue pas le worker pour ça
+        logger.error(f" Initialisation OCR impossible dans le worker : {e}")
+
+    while True:
+        try:
+            task = conn.recv()
+        except (EOFError, OSError):
+            break  # Parent disparu
+        if task is None:
+            break
+        # send() bloque si le parent ne suit pas : backpressure naturelle jusqu'au loader
+        _worker_stream_file(task, lambda batch: conn.send_bytes(batch.to_ipc()))
+        conn.send_bytes(MSG_DONE)
+
+class _WorkerSlot:
+    __slots__ = ("process", "conn", "task", "started_at")
+
+    def __init__(self, process, conn):
+        self.process = process
+        self.conn = conn
+        self.task = None
+        self.started_at = None
+
+class WorkerPool:
+    """
+    Pool de workers persistant partagé entre tous les datasets d'un run.
+    Le contexte de chaque dataset est publié sur disque sous une version ;
+    les tâches ne transportent que (version, chemin) et chaque worker ne
+    recharge le contexte qu'au premier fichier d'une nouvelle version.
+    Chaque worker a son propre Pipe : on sait quel fichier il traite, et on
+    peut le tuer/relancer sans corrompre les autres canaux.
+    """
+
+    def __init__(self, max_workers=None):
+        self.max_workers = max_workers or config.MAX_WORKERS
+        self._slots = []
+        self._context_dir = None
+        self._version = 0
+        self._context_path = None
+
+    def start(self):
+        if not self._slots:
+            # Tracker partagé : les segments image créés par un worker sont libérés par le parent
+            resource_tracker.ensure_running()
+            self._context_dir = tempfile.mkdtemp(prefix="worker_ctx_", dir=config.COMPUTED_DIR)
+            self._slots = [self._spawn() for _ in range(self.max_workers)]
+        return self
+
+    def _spawn(self):
+        parent_conn, child_conn = multiprocessing.Pipe()
+        process = multiprocessing.Process(target=_worker_main, args=(child_conn,), name="engine_ingest_worker")
+        process.start()
+        child_conn.close()
+        return _WorkerSlot(process, parent_conn)
+
+    def set_context(self, context):
+        """Publie une nouvelle version du contexte (l'ancienne est supprimée du disque)."""
+        previous = self._context_path
+        self._version += 1
+        self._context_path = os.path.join(self._context_dir, f"context_v{self._version}.pkl")
+        with open(self._context_path, "wb") as f:
+            pickle.dump(context, f, protocol=pickle.HIGHEST_PROTOCOL)
+        if previous and os.path.exists(previous):
+            os.remove(previous)
+        return self._version
+
+    # --- ÉTAT DES WORKERS ---
+    def idle_slots(self):
+        return [s for s in self._slots if s.task is None]
+
+    def busy_slots(self):
+        return [s for s in self._slots if s.task is not None]
+
+    def elapsed(self, slot):
+        return time.monotonic() - slot.started_at if slot.started_at else 0.0
+
+    def memory_mb(self, slot):
+        try:
+            return psutil.Process(slot.process.pid).memory_info().rss / (1024 * 1024)
+        except (psutil.NoSuchProcess, psutil.AccessDenied):
+            return 0.0
+
+    # --- DISTRIBUTION ---
+    def assign(self, slot, task):
+        """Confie une tâche (file_path, file_hash, options) à un worker inactif."""
+        if not slot.process.is_alive():
+            self.restart(slot)
+        file_path, file_hash, options = task
+        slot.conn.send((file_path, file_hash, options, self._version, self._context_path))
+        slot.task = task
+        slot.started_at = time.monotonic()
+
+    def collect(self, timeout):
+        """
+        Attend au plus `timeout` secondes et renvoie [(task, DocumentBatch | None, done)].
+        Chaque lot reçu relance le chronomètre : le budget temps mesure l'absence de progrès.
+        """
+        busy = {s.conn: s for s in self.busy_slots()}
+        if not busy: return []
+        received = []
+        for conn in wait(list(busy), timeout=timeout):
+            slot = busy[conn]
+            try:
+                payload = conn.recv_bytes()
+            except (EOFError, OSError):
+                continue  # Worker mort : pris en charge par le contrôle des budgets
+            task = slot.task
+            if payload == MSG_DONE:
+                slot.task, slot.started_at = None, None
+                received.append((task, None, True))
+            else:
+                slot.started_at = time.monotonic()
+                received.append((task, DocumentBatch.from_ipc(payload), False))
+        return received
+
+    def restart(self, slot):
+        """Tue le worker (tâche en cours perdue) et le remplace par un neuf."""
+        if slot.process.is_alive():
+            slot.process.kill()
+        slot.process.join(timeout=5)
+        slot.conn.close()
+        fresh = self._spawn()
+        slot.process, slot.conn = fresh.process, fresh.conn
+        slot.task, slot.started_at = None, None
+
+    def shutdown(self):
+        for slot in self._slots:
+            try:
+                slot.conn.send(None)
+            except (BrokenPipeError, OSError):
+                pass
+        for slot in self._slots:
+            slot.process.join(timeout=10)
+            if slot.process.is_alive():
+                slot.process.kill()
+                slot.process.join()
+            slot.conn.close()
+        self._slots = []
+        if self._context_dir:
+            shutil.rmtree(self._context_dir, ignore_errors=True)
+            self._context_dir = None
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, exc_type, exc, tb):
+        self.shutdown()
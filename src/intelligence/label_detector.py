@@ -2,6 +2,7 @@
 import os
 import re
 from collections import Counter
+from itertools import islice
 import gc
 from typing import Any
 from src import config
@@ -12,6 +13,7 @@ from src.intelligence.llm_manager import  get_llm
 from src.utils.logger import setup_logger
 import pandas as pd
 from src.ingestion.dispatcher import VISUAL_EXTENSIONS
+from src.ingestion.loaders.json_loader import iter_json_records, JSON_EXTENSIONS
 logger = setup_logger("LabelDetector")
 
 # Cache pour les correspondances explicites (filename -> label) [Niveau 0]
@@ -47,8 +49,13 @@ def _discover_file_plan(path: str, ext: str, image_map: dict) -> dict | None:
     label_col = None
 
     try:
-        sep = '\t' if ext.endswith('.tsv') else (',' if ext.endswith('.csv') else None)
-        df_sample = pd.read_csv(path, nrows=10, sep=sep, engine='python', on_bad_lines='skip')
+        if ext.endswith(JSON_EXTENSIONS):
+            # Échantillon JSON lu en streaming (pas de json.load du fichier entier)
+            records = [r for r in islice(iter_json_records(path), 10) if isinstance(r, dict)]
+            df_sample = pd.DataFrame(records)
+        else:
+            sep = '\t' if ext.endswith('.tsv') else (',' if ext.endswith('.csv') else None)
+            df_sample = pd.read_csv(path, nrows=10, sep=sep, engine='python', on_bad_lines='skip')
         if df_sample is None or df_sample.empty: return None
 
         # 1. ÉTAPE A : RECHERCHE DU CHEMIN (Preuve physique via Map RAM)
@@ -137,7 +144,7 @@ def analyze_dataset_structure(dataset_path):
     for root, _, files in os.walk(dataset_path):
         for f in files:
             ext = f.lower()
-            if any(ext.endswith(x) for x in [".txt", ".csv", ".tsv", ".json"]):
+            if any(ext.endswith(x) for x in [".txt", ".csv", ".tsv", *JSON_EXTENSIONS]):
                 path = os.path.join(root, f)
                 plan = _discover_file_plan(path, ext, image_map)
                 
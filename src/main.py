@@ -33,6 +33,18 @@ def main():
     # Commande Serve
     subparsers.add_parser("serve", help="Démarrer l'API de recherche")
 
+    # Commande Maintain
+    maintain_parser = subparsers.add_parser("maintain", help="Compacter le catalogue et rafraîchir les index")
+    maintain_parser.add_argument("-f", "--force", action="store_true",
+                                 help="Ignorer les seuils de déclenchement")
+
+    # Commande ONNX
+    onnx_parser = subparsers.add_parser("onnx", help="Exporter CLIP en ONNX (+int8) et vérifier la parité")
+    onnx_parser.add_argument("--no-quantize", action="store_true", help="Pas de variante int8")
+    onnx_parser.add_argument("--parity-only", action="store_true", help="Vérifier la parité sans ré-exporter")
+    onnx_parser.add_argument("--sample", default=None, help="Dossier de dataset : textes/images réels pour la parité")
+    onnx_parser.add_argument("--threads", type=int, default=None, help="Threads communs PyTorch / ONNX pendant la mesure")
+
     args = parser.parse_args()
 
     # Vérification de l'environnement
@@ -48,6 +60,16 @@ def main():
         logger.info(" Lancement du mode surveillance...")
         start_watching()
         
+    elif args.command == "maintain":
+        from src.indexing.maintenance import run_maintenance
+        run_maintenance(force=args.force)
+
+    elif args.command == "onnx":
+        from src.embeddings.onnx_backend import export_onnx, parity_check
+        if not args.parity_only:
+            export_onnx(quantize=not args.no_quantize)
+        parity_check(sample_dir=args.sample, threads=args.threads)
+
     elif args.command == "serve":
         import uvicorn
         logger.info("Démarrage de l'API sur http://localhost:8000")
@@ -1,6 +1,7 @@
 # src/search/retriever.py
 import pandas as pd
-from src.indexing.vector_store import init_tables 
+from src import config
+from src.indexing.vector_store import init_tables, is_vector_indexed, VECTOR_METRICS
 from src.search.scorer import TrustScorer
 from src.utils.logger import setup_logger
 
@@ -10,8 +11,28 @@ class MultiDomainRetriever:
     def __init__(self):
         # Initialisation unique de la table LanceDB
         self.table = init_tables()
+        # Colonnes indexées (IVF-PQ) ; les autres restent en scan plat exact
+        self.indexed = {c for c in ("vector", "visual_pure") if is_vector_indexed(self.table, c)}
         logger.info("Moteur de recherche hybride LanceDB prêt.")
 
+    def _vector_query(self, vec, column="vector"):
+        # Même métrique que l'index de la colonne (sinon LanceDB ignore l'index)
+        query = self.table.search(vec, vector_column_name=column).metric(VECTOR_METRICS[column])
+        if column in self.indexed:
+            query = query.nprobes(config.SEARCH_NPROBES).refine_factor(config.SEARCH_REFINE_FACTOR)
+        return query
+
+    @staticmethod
+    def _fetch(query, column, k):
+        """
+        Résultats d'une passe avec `_distance` ramenée à l'échelle L2 au carré (celle du TrustScorer) :
+        pour des vecteurs normalisés, L2² = 2 x distance cosinus.
+        """
+        res = query.limit(k).to_pandas()
+        if VECTOR_METRICS[column] == "cosine" and "_distance" in res:
+            res["_distance"] = res["_distance"] * 2.0
+        return res
+
     def search(self, processed_query: dict, k: int = 10):
         """Recherche Tri-Pass : Visuelle Pure, Fusionnée et Label."""
         fused_vec = processed_query["fused_vector"]
@@ -23,17 +44,17 @@ class MultiDomainRetriever:
 
         try:
             # PASS 1 : Recherche Visuelle Pure (100% Précision Image)
-            res_pure = self.table.search(pure_vec, vector_column_name="visual_pure").limit(k).to_pandas()
+            res_pure = self._fetch(self._vector_query(pure_vec, "visual_pure"), "visual_pure", k)
             all_matches.append(res_pure)
 
             # PASS 2 : Recherche Fusionnée (Sémantique & Contexte)
-            res_fused = self.table.search(fused_vec, vector_column_name="vector").limit(k).to_pandas()
+            res_fused = self._fetch(self._vector_query(fused_vec, "vector"), "vector", k)
             all_matches.append(res_fused)
 
-            # PASS 3 : Recherche par Label (FTS / SQL LIKE)
+            # PASS 3 : Recherche par Label (prefilter : le filtre passe par les index scalaires avant l'ANN)
             sql_filter = self._build_sql_filter(filters)
             if sql_filter:
-                res_label = self.table.search(fused_vec).where(sql_filter).limit(k).to_pandas()
+                res_label = self._fetch(self._vector_query(fused_vec).where(sql_filter, prefilter=True), "vector", k)
                 all_matches.append(res_label)
 
             # FUSION ET DÉDOUBLONNAGE
@@ -61,7 +82,8 @@ class MultiDomainRetriever:
         # Filtrage par domaine
         domain = filters.get("domain")
         if domain and domain != "unknown":
-            clauses.append(f"domain = '{domain}'")
+            domain_esc = str(domain).replace("'", "''")
+            clauses.append(f"domain = '{domain_esc}'")
         
         # Filtrage par label 
         label = filters.get("label")
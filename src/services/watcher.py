@@ -62,6 +62,19 @@ class DatasetHandler(FileSystemEventHandler):
         except Exception as e:
             logger.error(f"Erreur lors de l'exécution du processus d'ingestion : {e}")
 
+    def run_maintenance(self):
+        """Maintenance du catalogue dans un processus séparé (seuils évalués par la commande)."""
+        try:
+            subprocess.run(
+                [sys.executable, "-m", "src.main", "maintain"],
+                check=True,
+                cwd=str(config.BASE_DIR)
+            )
+        except subprocess.CalledProcessError as e:
+            logger.error(f"Échec de la maintenance (Code de sortie: {e.returncode}).")
+        except Exception as e:
+            logger.error(f"Erreur lors de l'exécution de la maintenance : {e}")
+
 def start_watching():
     """Point d'entrée principal du service de surveillance."""
     if not config.DATASET_DIR.exists():
@@ -75,12 +88,17 @@ def start_watching():
     
     logger.info(f"SmartSearch Watcher actif sur : {config.DATASET_DIR}")
 
+    last_maintenance = time.time()
     try:
         while True:
             if handler.pending_event:
                 if (time.time() - handler.last_trigger_time) > handler.debounce_seconds:
                     handler.run_ingestion()
                     handler.pending_event = False
+            # Maintenance périodique, uniquement hors ingestion (pas de compaction concurrente)
+            elif (time.time() - last_maintenance) > config.MAINT_INTERVAL:
+                handler.run_maintenance()
+                last_maintenance = time.time()
             time.sleep(1)
     except KeyboardInterrupt:
         logger.info("Arrêt du Watcher...")
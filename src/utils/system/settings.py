@@ -37,6 +37,11 @@ LANCEDB_URI = COMPUTED_DIR / "lancedb_store"
 TABLE_NAME = "multimodal_catalog"
 METADATA_DB_PATH = COMPUTED_DIR / "metadata.db"
 SCHEMA_CACHE_PATH = COMPUTED_DIR / "schema_cache.json"
+QUARANTINE_PATH = COMPUTED_DIR / "quarantine.json"
+HASH_FILTER_PATH = COMPUTED_DIR / "indexed_hashes.bloom"
+VECTOR_INDEX_STATE_PATH = COMPUTED_DIR / "vector_index_state.json"
+EMBEDDING_CACHE_DIR = COMPUTED_DIR / "embedding_cache"
+ONNX_DIR = COMPUTED_DIR / "onnx"
 
 # Création automatique des dossiers
 for path in [COMPUTED_DIR, LANCEDB_URI]:
@@ -0,0 +1,62 @@
+# tests/test_json_loader.py
+import io
+import json
+import random
+
+import pytest
+
+from src.ingestion.loaders.json_loader import _iter_json_array, iter_json_records
+
+BUFFER_SIZES = [1, 2, 3, 5, 8, 16, 64]
+
+def _random_scalar(rng):
+    return rng.choice([
+        rng.randint(-10**12, 10**12),
+        rng.uniform(-1e12, 1e12),
+        float(rng.randint(1, 10**11)),
+        rng.choice([1.5e-7, -2.25e30, 0.0, 10.0]),
+        rng.choice([True, False, None]),
+        "".join(rng.choice("ab ,]}[{\"\\é\n") for _ in range(rng.randint(0, 12))),
+    ])
+
+def _random_value(rng, depth=0):
+    kind = rng.random()
+    if depth < 3 and kind < 0.2:
+        return [_random_value(rng, depth + 1) for _ in range(rng.randint(0, 4))]
+    if depth < 3 and kind < 0.4:
+        return {f"k{i}": _random_value(rng, depth + 1) for i in range(rng.randint(0, 4))}
+    return _random_scalar(rng)
+
+def _dump(items, rng):
+    """Tableau JSON avec des espacements variés entre les éléments."""
+    seps = [",", ", ", ",\n  ", "\n,", " , "]
+    body = rng.choice(seps).join(json.dumps(x, ensure_ascii=rng.random() < 0.5) for x in items)
+    return rng.choice(["[", "[\n  ", " [ "]) + body + rng.choice(["]", "\n]", " ]\n"])
+
+def _parse(text, buffer_size):
+    return list(_iter_json_array(io.StringIO(text), json.JSONDecoder(), buffer_size))
+
+@pytest.mark.parametrize("seed", range(200))
+def test_array_roundtrip_any_buffer_size(seed):
+    rng = random.Random(seed)
+    items = [_random_value(rng) for _ in range(rng.randint(0, 20))]
+    text = _dump(items, rng)
+    for size in BUFFER_SIZES:
+        assert _parse(text, size) == items
+
+@pytest.mark.parametrize("size", BUFFER_SIZES)
+def test_number_split_after_dot_or_exponent(size):
+    for text in ["[\n  15000000000.0\n]", "[1.5e10, 2E-3,\n-0.25]", "[12345678901234567890]"]:
+        assert _parse(text, size) == json.loads(text)
+
+def test_malformed_trailing_scalar_raises():
+    with pytest.raises(json.JSONDecodeError):
+        _parse("[1, 2.]", 4)
+
+def test_iter_json_records_small_buffer(tmp_path, monkeypatch):
+    from src import config
+    monkeypatch.setattr(config, "FILE_READ_BUFFER_SIZE", 16)
+    items = [{"id": i, "price": i * 1000000000.5} for i in range(50)]
+    path = tmp_path / "data.json"
+    path.write_text(json.dumps(items, indent=2), encoding="utf-8")
+    assert list(iter_json_records(str(path))) == items